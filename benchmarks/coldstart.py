@@ -0,0 +1,93 @@
+"""Cold start: the first render of each page in a brand-new process.
+
+    python benchmarks/coldstart.py                 # 1,000 shows
+    python benchmarks/coldstart.py --shows 10000 --runs 5
+
+Every measurement starts a new interpreter, as a freshly scaled-out
+container does, and renders one page with AppTest. Reported per page: the
+first render (importing the app and the modules that page needs, opening
+the database, building caches), a second render in the same process, and
+whether pandas and plotly.express had to be loaded. Importing Streamlit
+itself is common to every page and timed separately. The fastest of
+``--runs`` processes is kept.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+
+HEAVY_MODULES = ("pandas", "plotly.express")
+
+
+def measure(app, page):
+    """First and second render of ``page``; runs in a fresh process."""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_ms = (time.perf_counter() - started) * 1000
+
+    logging.disable(logging.WARNING)
+    at = AppTest.from_file(app, default_timeout=600)
+    at.session_state["page"] = page
+    times = []
+    for _ in range(2):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "streamlit_ms": round(streamlit_ms, 1),
+        "first_ms": round(times[0], 1),
+        "second_ms": round(times[1], 1),
+        "loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+        "errors": [str(error.value) for error in at.exception]
+    }
+
+
+def run_page(app, db_path, page):
+    env = dict(os.environ, SWAR_DB_PATH=db_path, SWAR_POLL_SECONDS="0")
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", page, "--app", app],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=1000, help="shows in the synthetic dataset")
+    parser.add_argument("--runs", type=int, default=3, help="processes per page; the fastest is kept")
+    parser.add_argument("--app", default=APP, help="app script to start")
+    parser.add_argument("--measure", metavar="PAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.app, args.measure)))
+        return 0
+
+    # Imported here, so the measuring processes start with nothing of the app loaded
+    from dataset import build
+
+    from swar.pages import PAGES
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build(os.path.join(directory, "coldstart.db"), args.shows)
+        print(f"{args.shows:,} shows")
+        print(f"{'page':<10} {'streamlit ms':>12} {'first ms':>9} {'second ms':>10}  loaded")
+        for page in PAGES:
+            r = min((run_page(args.app, db_path, page) for _ in range(args.runs)), key=lambda r: r["first_ms"])
+            print(f"{page:<10} {r['streamlit_ms']:>12.0f} {r['first_ms']:>9.0f} {r['second_ms']:>10.0f}  {', '.join(r['loaded']) or '-'}")
+            for error in r["errors"]:
+                print(f"  {page} raised: {error}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Synthetic SQLite datasets for the benchmarks.
+
+    python benchmarks/dataset.py swar-10k.db 10000
+
+The roster and venue list grow with the number of shows, show dates spread
+over the year around today, and each show gets its ticket sales logged as
+the bulk importer would.
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swar.storage import Repository  # noqa: E402
+
+SPECIALTIES = ["Observational", "Storytelling", "Satire", "Musical", "Improv", "Political", "Family life", "Crowd work"]
+TITLES = ["Comedy Night", "Stand Up Special", "Comedy Jam", "Late Show", "Open Mic", "Headliners"]
+
+
+def build(path, shows, seed=0):
+    """Create (or replace) a database at ``path`` with ``shows`` shows; returns its path."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rnd = random.Random(seed)
+    comedians = max(20, shows // 10)
+    venues = max(5, shows // 50)
+    repo = Repository(path, seed=False)
+    repo.bulk_upsert("comedians", [
+        {"name": f"Comedian {i}", "rating": round(rnd.uniform(2.5, 5), 1), "fee": rnd.randrange(500, 20000, 500),
+         "specialty": rnd.choice(SPECIALTIES)}
+        for i in range(comedians)
+    ])
+    repo.bulk_upsert("venues", [
+        {"name": f"Venue {i}", "capacity": rnd.randrange(80, 600, 10), "rental_fee": rnd.randrange(500, 5000, 100)}
+        for i in range(venues)
+    ])
+    venue_list = repo.list_venues()
+    comedian_ids = [c.id for c in repo.list_comedians()]
+    start = datetime.now().replace(hour=20, minute=0, second=0, microsecond=0) - timedelta(days=180)
+    rows = []
+    for i in range(shows):
+        venue = rnd.choice(venue_list)
+        rows.append({
+            "title": f"{rnd.choice(TITLES)} #{i}",
+            "date": start + timedelta(days=rnd.randrange(365), minutes=rnd.choice([0, 150, 300])),
+            "venue_id": venue.id,
+            "capacity": venue.capacity,
+            "tickets_sold": rnd.randint(0, venue.capacity),
+            "ticket_price": rnd.choice([25, 40, 60]),
+            "duration_minutes": 120,
+            "comedian_ids": rnd.sample(comedian_ids, rnd.randint(1, 3))
+        })
+    repo.bulk_add_shows(rows)
+    repo.close()
+    return path
+
+
+if __name__ == "__main__":
+    build(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
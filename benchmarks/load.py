@@ -0,0 +1,140 @@
+"""Simulated users clicking through the app, ramped until the latency budget breaks.
+
+    python benchmarks/load.py                             # 1,000 shows; 1, 2, 4, ... 32 users
+    python benchmarks/load.py --shows 10000 --users 1 4 16 --duration 30
+
+Every simulated user is an AppTest session in its own process: AppTest
+swaps process-wide state (the runtime singleton, config) for each run, so
+sessions cannot share one. Users therefore compete for the CPU and the
+database file as a server's sessions do, but each warms its own caches;
+that warm-up happens before the clock starts. Each user keeps clicking a
+random sidebar page, and on the Shows page now and then sells a ticket for
+a random show, so reads race with writes (the page is kept in Cards view,
+where the Sell buttons are). For each step of the ramp the p50 and p95
+interaction time, interactions per second, tickets sold and errors are
+printed. A step that should have sold tickets but sold none counts as an
+error, since the write path then never ran. The ramp stops at the first
+step whose p95 exceeds the latency budget (``SWAR_LATENCY_BUDGET_MS``) or
+that raises.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import multiprocessing
+import time
+
+from dataset import build
+
+from swar.pages import PAGES  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+
+DEFAULT_USERS = (1, 2, 4, 8, 16, 32)
+
+
+def click(at, label, rnd=None):
+    """Click the button labelled ``label`` (a random one of them with ``rnd``); False if there is none."""
+    buttons = [button for button in at.button if button.label == label]
+    if not buttons:
+        return False
+    (rnd.choice(buttons) if rnd else buttons[0]).click().run()
+    return True
+
+
+def simulate(seed, duration, write_ratio, ready, results):
+    """One user: warm up, wait for the others, then click pages for ``duration`` seconds."""
+    from streamlit.testing.v1 import AppTest
+
+    # Keep deprecation warnings out of the report
+    logging.disable(logging.WARNING)
+    rnd = random.Random(seed)
+    at = AppTest.from_file(APP, default_timeout=120)
+    # Past the table threshold the Shows page opens in Table view, which has no Sell buttons
+    at.session_state["shows_view"] = "Cards"
+    at.run()
+    latencies, errors, sales = [], [], 0
+    ready.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        page = rnd.choice(list(PAGES))
+        started = time.perf_counter()
+        try:
+            click(at, f"{PAGES[page]} {page}")
+            if page == "Shows" and rnd.random() < write_ratio:
+                sales += click(at, "Sell Tickets", rnd)
+        except Exception as e:
+            errors.append(repr(e))
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        errors.extend(str(error.value) for error in at.exception)
+    results.put((latencies, errors, sales))
+
+
+def step(users, duration, write_ratio):
+    # Spawned, not forked: each user imports the app afresh with this run's settings
+    context = multiprocessing.get_context("spawn")
+    ready = context.Barrier(users + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=simulate, args=(seed, duration, write_ratio, ready, results))
+        for seed in range(users)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    started = time.perf_counter()
+    latencies, errors, sales = [], [], 0
+    for _ in processes:
+        user_latencies, user_errors, user_sales = results.get()
+        latencies.extend(user_latencies)
+        errors.extend(user_errors)
+        sales += user_sales
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return latencies, errors, sales, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=1000, help="shows in the synthetic dataset")
+    parser.add_argument("--users", type=int, nargs="+", default=DEFAULT_USERS, help="concurrent users per step")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per step")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="chance a Shows visit also sells a ticket")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["SWAR_DB_PATH"] = build(os.path.join(directory, "load.db"), args.shows)
+        # No background polling: every run measured is a click
+        os.environ["SWAR_POLL_SECONDS"] = "0"
+        from swar.latency import DEFAULT_BUDGET_MS
+
+        print(f"{args.shows:,} shows, budget {DEFAULT_BUDGET_MS:.0f} ms")
+        print(f"{'users':>6} {'clicks':>7} {'per s':>7} {'p50 ms':>8} {'p95 ms':>8} {'sales':>6} {'errors':>7}")
+        for users in args.users:
+            latencies, errors, sales, elapsed = step(users, args.duration, args.write_ratio)
+            if not latencies:
+                print(f"{users:>6} no interaction finished within {args.duration:.0f} s")
+                return 1
+            p50 = statistics.median(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            if args.write_ratio and not sales:
+                errors.append("no ticket was sold, so the write path never ran")
+            print(f"{users:>6} {len(latencies):>7} {len(latencies) / elapsed:>7.1f} {p50:>8.0f} {p95:>8.0f} {sales:>6} {len(errors):>7}")
+            if errors:
+                print(f"Errors at {users} users, first: {errors[0]}")
+                return 1
+            if p95 > DEFAULT_BUDGET_MS:
+                print(f"p95 over budget at {users} concurrent users")
+                return 0
+    print("Within budget at every step")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Memory held by the in-memory show catalogue, before and after swar.models.
+
+Builds the same synthetic catalogue twice: as the dict rows the repository
+used to keep (venue and comedian names copied into every show, as SQLite
+hands out a fresh string per row) and as the :mod:`swar.models` records it
+keeps now (ids only, interned titles). Sizes are measured with tracemalloc.
+
+    python benchmarks/memory.py                 # 10k, 100k and 1M shows
+    python benchmarks/memory.py 50000 200000
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swar.models import Show  # noqa: E402
+
+DEFAULT_COUNTS = (10_000, 100_000, 1_000_000)
+
+COMEDIANS = 2_000
+VENUES = 200
+TITLES = ["Comedy Night", "Stand Up Special", "Comedy Jam", "Late Show", "Open Mic", "Headliners"]
+
+
+def fresh(text):
+    """An equal but distinct string, as each row read from SQLite is."""
+    return text.encode().decode()
+
+
+def catalogue(count, seed=0):
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1, 20)
+    for show_id in range(1, count + 1):
+        lineup = rnd.sample(range(1, COMEDIANS + 1), rnd.randint(1, 4))
+        yield (
+            show_id, f"{rnd.choice(TITLES)} #{show_id % 52}", start + timedelta(hours=show_id),
+            rnd.randint(1, VENUES), 200, rnd.randint(0, 200), 25.0, 120, lineup
+        )
+
+
+def as_dicts(rows):
+    return [
+        {
+            "id": show_id, "title": fresh(title), "date": date, "venue_id": venue_id,
+            "venue": fresh(f"Venue {venue_id}"), "capacity": capacity, "tickets_sold": sold,
+            "ticket_price": price, "duration_minutes": duration, "comedian_ids": list(lineup),
+            "comedians": [fresh(f"Comedian {comedian_id}") for comedian_id in lineup]
+        }
+        for show_id, title, date, venue_id, capacity, sold, price, duration, lineup in rows
+    ]
+
+
+def as_records(rows):
+    return [
+        Show(show_id, sys.intern(fresh(title)), date, venue_id, capacity, sold, price, duration, tuple(lineup))
+        for show_id, title, date, venue_id, capacity, sold, price, duration, lineup in rows
+    ]
+
+
+def measure(build, count):
+    rows = list(catalogue(count))
+    tracemalloc.start()
+    started = time.perf_counter()
+    shows = build(rows)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del shows
+    return size, elapsed
+
+
+def main(counts):
+    print(f"{'shows':>10} {'dicts MB':>10} {'records MB':>11} {'saved':>7} {'dicts s':>8} {'records s':>10}")
+    for count in counts:
+        dict_size, dict_time = measure(as_dicts, count)
+        record_size, record_time = measure(as_records, count)
+        print(
+            f"{count:>10,} {dict_size / 2**20:>10.1f} {record_size / 2**20:>11.1f} "
+            f"{1 - record_size / dict_size:>7.0%} {dict_time:>8.2f} {record_time:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,112 @@
+"""Check that concurrent ticket sales never oversell a show.
+
+    python benchmarks/oversell.py
+    python benchmarks/oversell.py --threads 8 --shows 20 --capacity 50
+
+Threads split across two ``Repository`` connections to one database file
+sell and hold small batches of seats on a handful of small shows until
+every show is sold out, as sessions of one server and a second process
+would. Afterwards every show must have sold exactly its capacity, no more,
+with the sales log and the tickets the threads were told they sold both
+adding up to the same number. Editing a show past its capacity must be
+refused as well. Any violation makes the exit status 1.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swar.storage import Repository, SoldOut  # noqa: E402
+
+
+def sell_until_sold_out(repo, show_ids, seed, sold, errors):
+    rnd = random.Random(seed)
+    open_shows = list(show_ids)
+    while open_shows:
+        show_id = rnd.choice(open_shows)
+        quantity = rnd.randint(1, 3)
+        try:
+            if rnd.random() < 0.3:
+                repo.confirm_hold(repo.hold_tickets(show_id, quantity))
+            else:
+                repo.sell_tickets(show_id, quantity)
+        except SoldOut as error:
+            if error.available == 0:
+                open_shows.remove(show_id)
+            continue
+        except Exception as error:
+            errors.append(f"{type(error).__name__}: {error}")
+            return
+        sold[show_id] = sold.get(show_id, 0) + quantity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=4, help="selling threads per connection")
+    parser.add_argument("--shows", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "oversell.db")
+        repos = [Repository(path, seed=False), Repository(path, seed=False)]
+        venue_id = repos[0].add_venue("Test Room", args.capacity, 1000)
+        comedian_id = repos[0].add_comedian("Test Comic", 4.0, 1000)
+        when = datetime.now() + timedelta(days=7)
+        show_ids = [
+            repos[0].add_show(f"Show {i}", when + timedelta(days=i), venue_id, args.capacity, [comedian_id])
+            for i in range(args.shows)
+        ]
+
+        tallies, errors = [], []
+        threads = []
+        for i in range(2 * args.threads):
+            tallies.append({})
+            threads.append(threading.Thread(
+                target=sell_until_sold_out, args=(repos[i % 2], show_ids, i, tallies[-1], errors)
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        repos[0].sync()
+        logged = {}
+        for _, show_id, _, revenue in repos[0].sales_since(0):
+            logged[show_id] = logged.get(show_id, 0) + round(revenue / repos[0].get_show(show_id).ticket_price)
+        failures = list(errors)
+        for show_id in show_ids:
+            show = repos[0].get_show(show_id)
+            told = sum(tally.get(show_id, 0) for tally in tallies)
+            if not show.tickets_sold == told == logged.get(show_id, 0) == show.capacity:
+                failures.append(
+                    f"{show.title}: capacity {show.capacity}, tickets_sold {show.tickets_sold}, "
+                    f"sold by threads {told}, in the sales log {logged.get(show_id, 0)}"
+                )
+
+        for fields in ({"tickets_sold": args.capacity + 1}, {"capacity": args.capacity - 1}, {"tickets_sold": -1}):
+            try:
+                repos[1].update_show(show_ids[0], **fields)
+            except ValueError:
+                continue
+            failures.append(f"update_show({fields}) was accepted on a sold-out show")
+
+        for repo in repos:
+            repo.close()
+
+    total = args.shows * args.capacity
+    print(f"{2 * args.threads} threads on 2 connections sold {total:,} seats across {args.shows} shows")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("No show oversold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Render every page with Streamlit's AppTest against synthetic datasets.
+
+    python benchmarks/pages.py                        # 100 and 1,000 shows, checked against baseline.json
+    python benchmarks/pages.py --sizes 10000 --reruns 5
+    python benchmarks/pages.py --update-baseline
+
+Each dataset size is measured in its own process, so caches and memory
+start clean. Every page runs once cold (right after clearing
+``st.cache_resource``) and then ``--reruns`` times warm; the script time of
+each run, the number of elements rendered, and the peak memory of one more
+warm run are recorded. Memory is traced in a separate run because tracing
+slows the script down. Cold is the time to the first answer; when that
+answer is a progress bar for background jobs, the jobs are waited for and
+the page is rerun, untimed, until it starts no more of them before the
+warm runs.
+
+Against the baseline, a page regresses if it raises, renders more
+elements, or its median warm time or peak memory grows by more than
+``--tolerance`` (and, for time, by more than ``--min-delta-ms``, since a
+page that renders in 20 ms jitters by half that from run to run). Any regression makes the exit status 1. Times depend on
+the machine, so refresh the baseline on the machine that runs the check.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dataset import build
+
+from swar.pages import PAGES  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+DEFAULT_SIZES = (100, 1000)
+
+# Smallest slowdown reported, whatever the tolerance
+MIN_DELTA_MS = 25
+
+
+def count_elements(node):
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def wait_for_jobs(runner, timeout=600):
+    deadline = time.monotonic() + timeout
+    while runner.active() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def measure(reruns):
+    """Measure every page against the database in ``SWAR_DB_PATH``; runs in a fresh process."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from swar.resources import get_job_runner
+
+    logging.disable(logging.WARNING)
+    results = {}
+    for page in PAGES:
+        st.cache_resource.clear()
+        at = AppTest.from_file(APP, default_timeout=600)
+        at.session_state["page"] = page
+        times = []
+        for run in range(reruns + 1):
+            started = time.perf_counter()
+            at.run()
+            times.append((time.perf_counter() - started) * 1000)
+            if run == 0:
+                # Rerun (untimed) until the page has picked up every job's result
+                wait_for_jobs(get_job_runner())
+                at.run()
+                while get_job_runner().active():
+                    wait_for_jobs(get_job_runner())
+                    at.run()
+        tracemalloc.start()
+        at.run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[page] = {
+            "cold_ms": round(times[0], 1),
+            "warm_ms": [round(t, 1) for t in times[1:]],
+            "median_warm_ms": round(statistics.median(times[1:] or times), 1),
+            "elements": count_elements(at.main) + count_elements(at.sidebar),
+            "peak_mb": round(peak / 2**20, 2),
+            "errors": [str(error.value) for error in at.exception]
+        }
+    return results
+
+
+def run_size(size, reruns):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build(os.path.join(directory, "bench.db"), size)
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", "--reruns", str(reruns)],
+            check=True, capture_output=True, text=True, env=dict(os.environ, SWAR_DB_PATH=db_path)
+        ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def regressions(results, baseline, tolerance, min_delta_ms=MIN_DELTA_MS):
+    found = []
+    for size, pages in results.items():
+        for page, current in pages.items():
+            if current["errors"]:
+                found.append(f"{size} shows, {page}: raised {current['errors'][0]}")
+            before = baseline.get(size, {}).get(page)
+            if before is None:
+                continue
+            if current["elements"] > before["elements"]:
+                found.append(f"{size} shows, {page}: {current['elements']} elements (baseline {before['elements']})")
+            for metric, unit, floor in (("median_warm_ms", "ms", min_delta_ms), ("peak_mb", "MB", 0)):
+                if current[metric] > before[metric] * (1 + tolerance) and current[metric] - before[metric] > floor:
+                    found.append(f"{size} shows, {page}: {current[metric]} {unit} (baseline {before[metric]} {unit})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="shows per dataset")
+    parser.add_argument("--reruns", type=int, default=3, help="warm reruns per page")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed growth in time and memory (0.5 = 50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS, help="ignore slowdowns smaller than this")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.reruns)))
+        return 0
+
+    results = {str(size): run_size(size, args.reruns) for size in args.sizes}
+    print(f"{'shows':>7} {'page':<10} {'cold ms':>8} {'warm ms':>8} {'elements':>9} {'peak MB':>8}")
+    for size, pages in results.items():
+        for page, r in pages.items():
+            print(f"{int(size):>7,} {page:<10} {r['cold_ms']:>8.0f} {r['median_warm_ms']:>8.0f} {r['elements']:>9} {r['peak_mb']:>8.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    found = regressions(results, baseline, args.tolerance, args.min_delta_ms)
+    for line in found:
+        print(f"REGRESSION {line}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Swar - The Standup Organizer: data and service layer behind the Streamlit app."""
@@ -0,0 +1,130 @@
+"""Incrementally maintained, columnar model of all shows.
+
+The Dashboard, Shows and Analytics pages all read show metrics from here.
+Stored columns come straight from the repository; occupancy, revenue and
+remaining capacity are derived for every show in one vectorized pass.
+
+The cache remembers the repository version it was built from. On refresh it
+replays the repository change log: new shows are appended, ticket sales and
+edits patch their row in place, and cancellations drop it, so a single sale
+no longer rebuilds the whole frame. Anything the log cannot express cheaply
+(roster or venue renames, a gap in the log) falls back to a full rebuild.
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from swar.incremental import IncrementalCache
+from swar.storage import DEFAULT_TICKET_PRICE
+
+# Ticket price tiers offered when scheduling a show
+PRICE_TIERS = {
+    "Standard": DEFAULT_TICKET_PRICE,
+    "Premium": 40,
+    "VIP": 60
+}
+
+SHOW_COLUMNS = ["title", "date", "venue", "capacity", "tickets_sold", "ticket_price", "lineup"]
+METRIC_COLUMNS = ["occupancy_rate", "revenue", "remaining"]
+
+
+def show_row(show, venue, lineup):
+    return {
+        "title": show.title,
+        "date": show.date,
+        "venue": venue.name if venue else "",
+        "capacity": show.capacity,
+        "tickets_sold": show.tickets_sold,
+        "ticket_price": show.ticket_price,
+        "lineup": ", ".join(lineup)
+    }
+
+
+def add_metrics(df):
+    """Return ``df`` with occupancy (%), revenue and remaining seats for every row."""
+    capacity = df["capacity"].to_numpy(dtype=float)
+    sold = df["tickets_sold"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        occupancy = np.where(capacity > 0, sold / capacity * 100, 0.0)
+    return df.assign(
+        occupancy_rate=occupancy,
+        revenue=sold * df["ticket_price"].to_numpy(dtype=float),
+        remaining=np.maximum(capacity - sold, 0).astype(int)
+    )
+
+
+class AnalyticsCache(IncrementalCache):
+    """Shows DataFrame and per-comedian show counts, kept in sync with a Repository."""
+
+    def __init__(self):
+        super().__init__()
+        self.shows_df = pd.DataFrame(columns=SHOW_COLUMNS + METRIC_COLUMNS)
+        self.comedian_counts = Counter()
+        self._lineups = {}
+        self._sorted = None
+
+    def can_patch(self, repo, changes):
+        # Comedian and venue names appear in every row that refers to them; a new one appears in none yet
+        return super().can_patch(repo, changes) and all(
+            table in ("shows", "sales") or op == "insert" for _, table, op, _ in changes
+        )
+
+    def upcoming(self):
+        """Shows sorted by date, as the Shows page lists them; sorted once per version."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = self.shows_df.sort_values("date", kind="stable")
+            return self._sorted
+
+    def comedian_df(self):
+        return pd.DataFrame(
+            [{"name": name, "shows": count} for name, count in self.comedian_counts.items() if count > 0]
+        )
+
+    def _rebuild(self, repo):
+        shows = repo.list_shows()
+        self._lineups = {show.id: tuple(c.name for c in repo.lineup(show)) for show in shows}
+        self.shows_df = pd.DataFrame(
+            [show_row(show, repo.get_venue(show.venue_id), self._lineups[show.id]) for show in shows],
+            index=pd.Index([show.id for show in shows], name="id"),
+            columns=SHOW_COLUMNS
+        )
+        self.comedian_counts = Counter(name for lineup in self._lineups.values() for name in lineup)
+
+    def _apply(self, repo, changes):
+        show_ids = dict.fromkeys(row_id for _, table, _, row_id in changes if table == "shows")
+
+        # Patch a copy so that readers holding the previous frame are unaffected
+        self.shows_df = self.shows_df.copy()
+        appended = []
+        for show_id in show_ids:
+            self._drop_lineup(show_id)
+            show = repo.get_show(show_id)
+            if show is None:
+                if show_id in self.shows_df.index:
+                    self.shows_df = self.shows_df.drop(index=show_id)
+                continue
+            lineup = self._lineups[show_id] = tuple(c.name for c in repo.lineup(show))
+            self.comedian_counts.update(lineup)
+            row = show_row(show, repo.get_venue(show.venue_id), lineup)
+            if show_id in self.shows_df.index:
+                self.shows_df.loc[show_id, SHOW_COLUMNS] = [row[column] for column in SHOW_COLUMNS]
+            else:
+                appended.append((show_id, row))
+
+        if appended:
+            new_rows = pd.DataFrame(
+                [row for _, row in appended],
+                index=pd.Index([show_id for show_id, _ in appended], name="id"),
+                columns=SHOW_COLUMNS
+            )
+            self.shows_df = new_rows if self.shows_df.empty else pd.concat([self.shows_df, new_rows])
+
+    def _updated(self):
+        self.shows_df = add_metrics(self.shows_df)
+        self._sorted = None
+
+    def _drop_lineup(self, show_id):
+        lineup = self._lineups.pop(show_id, ())
+        self.comedian_counts.subtract(lineup)
@@ -0,0 +1,326 @@
+"""Bulk import and export of comedians, venues and shows as CSV or Parquet.
+
+Files are streamed in chunks: each chunk is validated with vectorized pandas
+checks, de-duplicated on name (on title and date for shows) against both the
+rest of the file and the database, and written in a single transaction. Only
+one chunk is held in memory at a time, so season-sized files load fine.
+
+Command line usage::
+
+    python -m swar.bulk import comedians roster.csv
+    python -m swar.bulk import shows season.parquet --chunksize 20000
+    python -m swar.bulk export shows shows.csv
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from swar.storage import (
+    CAPACITY_RANGE, DEFAULT_DB_PATH, DEFAULT_DURATION_MINUTES, DEFAULT_TICKET_PRICE, FEE_RANGE, RATING_RANGE,
+    RENTAL_FEE_RANGE, Repository
+)
+
+CHUNK_SIZE = 10000
+
+# Validation errors kept for the report; the rest are only counted
+MAX_ERRORS = 20
+
+ENTITIES = ("comedians", "venues", "shows")
+FORMATS = ("csv", "parquet")
+
+REQUIRED_COLUMNS = {
+    "comedians": ["name", "rating", "fee"],
+    "venues": ["name", "capacity", "rental_fee"],
+    "shows": ["title", "date", "venue", "comedians"]
+}
+
+EXPORT_COLUMNS = {
+    "comedians": ["name", "rating", "fee", "specialty"],
+    "venues": ["name", "capacity", "rental_fee"],
+    "shows": ["title", "date", "venue", "capacity", "tickets_sold", "ticket_price", "duration_minutes", "comedians"]
+}
+
+
+class ImportReport:
+    """Running totals for one import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, row_numbers, message):
+        self.rejected += len(row_numbers)
+        for row_number in row_numbers[:MAX_ERRORS - len(self.errors)]:
+            self.errors.append(f"Row {row_number}: {message}")
+
+    def summary(self):
+        return (f"{self.rows} rows read: {self.inserted} added, {self.updated} updated, "
+                f"{self.duplicates} duplicates skipped, {self.rejected} rejected")
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension == "csv":
+        return "csv"
+    raise ValueError(f"Can't tell the format of '{filename}'; use a .csv or .parquet file")
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet support needs pyarrow: pip install pyarrow") from None
+    return pq
+
+
+def read_chunks(source, fmt, chunksize=CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunksize`` rows from a CSV or Parquet source."""
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False)
+    elif fmt == "parquet":
+        for batch in _parquet().ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'; expected one of {', '.join(FORMATS)}")
+
+
+def _numbers(chunk, column, default=None):
+    if column not in chunk:
+        return pd.Series(default, index=chunk.index, dtype=float)
+    values = pd.to_numeric(chunk[column].replace("", None), errors="coerce")
+    return values if default is None else values.fillna(default)
+
+
+def _text(chunk, column):
+    if column not in chunk:
+        return pd.Series("", index=chunk.index)
+    return chunk[column].fillna("").astype(str).str.strip()
+
+
+def _reject_where(chunk, invalid, message, report, offset):
+    if invalid.any():
+        report.reject([offset + position + 1 for position in invalid.to_numpy().nonzero()[0]], message)
+    return ~invalid
+
+
+def _reject_outside(chunk, valid, values, bounds, column, report, offset):
+    low, high = bounds
+    message = f"{column} must be between {low:,} and {high:,}"
+    return _reject_where(chunk, valid & ~values.between(low, high), message, report, offset)
+
+
+def _dedupe(keys, seen, report):
+    """Mask of rows whose key was not seen earlier in the file."""
+    keep = []
+    for key in keys:
+        keep.append(key not in seen)
+        seen.add(key)
+    report.duplicates += keep.count(False)
+    return keep
+
+
+def _comedian_rows(chunk, report, offset, seen, lookups):
+    name, specialty = _text(chunk, "name"), _text(chunk, "specialty")
+    rating, fee = _numbers(chunk, "rating"), _numbers(chunk, "fee")
+    valid = _reject_where(chunk, name == "", "name is empty", report, offset)
+    valid &= _reject_outside(chunk, valid, rating, RATING_RANGE, "rating", report, offset)
+    valid &= _reject_outside(chunk, valid, fee, FEE_RANGE, "fee", report, offset)
+    frame = pd.DataFrame({"name": name, "rating": rating, "fee": fee, "specialty": specialty})[valid]
+    frame = frame[_dedupe(frame["name"], seen, report)]
+    frame["fee"] = frame["fee"].astype(int)
+    return frame.to_dict("records")
+
+
+def _venue_rows(chunk, report, offset, seen, lookups):
+    name = _text(chunk, "name")
+    capacity, rental_fee = _numbers(chunk, "capacity"), _numbers(chunk, "rental_fee")
+    valid = _reject_where(chunk, name == "", "name is empty", report, offset)
+    valid &= _reject_outside(chunk, valid, capacity, CAPACITY_RANGE, "capacity", report, offset)
+    valid &= _reject_outside(chunk, valid, rental_fee, RENTAL_FEE_RANGE, "rental_fee", report, offset)
+    frame = pd.DataFrame({"name": name, "capacity": capacity, "rental_fee": rental_fee})[valid]
+    frame = frame[_dedupe(frame["name"], seen, report)]
+    frame = frame.astype({"capacity": int, "rental_fee": int})
+    return frame.to_dict("records")
+
+
+def _show_rows(chunk, report, offset, seen, lookups):
+    venues, comedian_ids = lookups["venues"], lookups["comedian_ids"]
+    title, venue = _text(chunk, "title"), _text(chunk, "venue")
+    date = pd.to_datetime(_text(chunk, "date"), errors="coerce", format="mixed")
+    venue_capacity = venue.map(lambda name: venues[name].capacity if name in venues else None)
+    capacity = _numbers(chunk, "capacity").fillna(venue_capacity.astype(float))
+    tickets_sold = _numbers(chunk, "tickets_sold", 0)
+    ticket_price = _numbers(chunk, "ticket_price", DEFAULT_TICKET_PRICE)
+    duration = _numbers(chunk, "duration_minutes", DEFAULT_DURATION_MINUTES)
+    lineups = _text(chunk, "comedians").map(lambda names: [n.strip() for n in names.split(";") if n.strip()])
+    unknown = lineups.map(lambda names: any(n not in comedian_ids for n in names) or not names)
+
+    valid = _reject_where(chunk, title == "", "title is empty", report, offset)
+    valid &= _reject_where(chunk, valid & date.isna(), "date is not a valid date", report, offset)
+    valid &= _reject_where(chunk, valid & ~venue.isin(list(venues)), "unknown venue", report, offset)
+    valid &= _reject_where(chunk, valid & unknown, "comedians must name existing comedians, separated by ';'", report, offset)
+    # The form always takes the venue's capacity, so an import may not exceed it
+    valid &= _reject_where(
+        chunk, valid & ~((capacity > 0) & (capacity <= venue_capacity)),
+        "capacity must be a positive number no larger than the venue's capacity", report, offset
+    )
+    valid &= _reject_where(
+        chunk, valid & ~((tickets_sold >= 0) & (tickets_sold <= capacity)),
+        "tickets_sold must be between 0 and capacity", report, offset
+    )
+    valid &= _reject_where(chunk, valid & ~((ticket_price >= 0) & (duration > 0)), "invalid price or duration", report, offset)
+
+    frame = pd.DataFrame({
+        "title": title, "date": date, "venue": venue, "capacity": capacity, "tickets_sold": tickets_sold,
+        "ticket_price": ticket_price, "duration_minutes": duration, "lineup": lineups
+    })[valid]
+    frame = frame[_dedupe(zip(frame["title"], frame["date"]), seen, report)]
+    return [
+        {
+            "title": row.title,
+            "date": row.date.to_pydatetime(),
+            "venue_id": venues[row.venue].id,
+            "capacity": int(row.capacity),
+            "tickets_sold": int(row.tickets_sold),
+            "ticket_price": float(row.ticket_price),
+            "duration_minutes": int(row.duration_minutes),
+            "comedian_ids": [comedian_ids[name] for name in row.lineup]
+        }
+        for row in frame.itertuples()
+    ]
+
+
+ROW_BUILDERS = {"comedians": _comedian_rows, "venues": _venue_rows, "shows": _show_rows}
+
+
+def import_file(repo, entity, source, fmt=None, chunksize=CHUNK_SIZE, update=False, progress=None):
+    """Stream ``source`` into the repository and return an :class:`ImportReport`.
+
+    ``source`` is a path or a binary file object; ``fmt`` defaults to the file
+    extension. Existing comedians and venues are skipped unless ``update`` is
+    set; existing shows (same title and date) are always skipped. ``progress``
+    is called with the number of rows processed after each chunk.
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"Unknown entity '{entity}'; expected one of {', '.join(ENTITIES)}")
+    fmt = fmt or detect_format(getattr(source, "name", source))
+    report = ImportReport()
+    seen = set()
+    # Shows refer to venues and comedians by name; resolve against one snapshot
+    lookups = {}
+    if entity == "shows":
+        lookups = {"venues": repo.venues_by_name(), "comedian_ids": repo.comedian_ids_by_name()}
+    for chunk in read_chunks(source, fmt, chunksize):
+        if report.rows == 0:
+            missing = [column for column in REQUIRED_COLUMNS[entity] if column not in chunk]
+            if missing:
+                raise ValueError(f"Missing column(s) for {entity}: {', '.join(missing)}")
+        chunk = chunk.reset_index(drop=True)
+        rows = ROW_BUILDERS[entity](chunk, report, report.rows, seen, lookups)
+        report.rows += len(chunk)
+        if rows:
+            if entity == "shows":
+                inserted, skipped = repo.bulk_add_shows(rows)
+                updated = 0
+            else:
+                inserted, updated, skipped = repo.bulk_upsert(entity, rows, update=update)
+            report.inserted += inserted
+            report.updated += updated
+            report.duplicates += skipped
+        if progress is not None:
+            progress(report.rows)
+    return report
+
+
+def export_file(repo, entity, target, fmt=None, chunksize=CHUNK_SIZE):
+    """Write every ``entity`` row to ``target`` (a path or binary file object)."""
+    if entity not in ENTITIES:
+        raise ValueError(f"Unknown entity '{entity}'; expected one of {', '.join(ENTITIES)}")
+    fmt = fmt or detect_format(getattr(target, "name", target))
+    chunks = (pd.DataFrame(rows, columns=EXPORT_COLUMNS[entity]) for rows in repo.iter_export(entity, chunksize))
+    if fmt == "csv":
+        _export_csv(chunks, entity, target)
+    elif fmt == "parquet":
+        _export_parquet(chunks, entity, target)
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'; expected one of {', '.join(FORMATS)}")
+
+
+def _export_csv(chunks, entity, target):
+    handle = open(target, "w", newline="", encoding="utf-8") if isinstance(target, str) else target
+    try:
+        header = True
+        for frame in chunks:
+            text = frame.to_csv(index=False, header=header)
+            handle.write(text if isinstance(target, str) else text.encode("utf-8"))
+            header = False
+        if header:
+            text = ",".join(EXPORT_COLUMNS[entity]) + "\n"
+            handle.write(text if isinstance(target, str) else text.encode("utf-8"))
+    finally:
+        if isinstance(target, str):
+            handle.close()
+
+
+def _export_parquet(chunks, entity, target):
+    import pyarrow as pa
+
+    pq = _parquet()
+    writer = None
+    try:
+        for frame in chunks:
+            if entity == "shows":
+                frame["date"] = pd.to_datetime(frame["date"])
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=EXPORT_COLUMNS[entity]), preserve_index=False), target)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m swar.bulk", description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("entity", choices=ENTITIES)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"database file (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--update", action="store_true", help="overwrite comedians/venues that already exist")
+    args = parser.parse_args(argv)
+
+    # A new database stays empty rather than getting the demo data
+    repo = Repository(args.db, seed=False)
+    try:
+        if args.action == "import":
+            report = import_file(
+                repo, args.entity, args.path, fmt=args.format, chunksize=args.chunksize, update=args.update,
+                progress=lambda rows: print(f"\r{rows} rows processed", end="", file=sys.stderr)
+            )
+            print(file=sys.stderr)
+            print(report.summary())
+            for error in report.errors:
+                print(f"  {error}")
+        else:
+            export_file(repo, args.entity, args.path, fmt=args.format, chunksize=args.chunksize)
+            print(f"Exported {args.entity} to {args.path}")
+    except (ValueError, ImportError, OSError) as error:
+        parser.exit(1, f"error: {error}\n")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Plotly figures for the Venues and Analytics pages, cached per data version.
+
+Building a figure with plotly express costs tens of milliseconds, and the
+data behind these charts only changes on a write. :class:`FigureCache` keeps
+the last figure built for each chart and rebuilds it only when the version
+it was built from moves on. Cached figures are shared between sessions, so
+they must not be modified after they are built.
+
+Chart payloads are kept bounded as the data grows. Category charts keep the
+largest categories and fold the rest into "Other". Once the shows pass
+:data:`WEBGL_THRESHOLD`, per-show revenue is drawn as a WebGL scatter over
+time, and past :data:`MAX_POINTS` it is downsampled to the smallest and
+largest show in each time bucket, so spikes and dips survive. Occupancy
+gauges are drawn a page at a time, alongside a binned distribution of all
+shows.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from swar.models import Venue
+
+# Charts (per chart and parameter combination) kept in memory
+FIGURE_CACHE_SIZE = 64
+
+# Shows per chart above which per-show charts switch to WebGL scatter traces
+WEBGL_THRESHOLD = int(os.environ.get("SWAR_WEBGL_THRESHOLD", 300))
+
+# Most points sent to the browser for a single per-show chart
+MAX_POINTS = 4000
+
+# Most bars or slices in a category chart; the remainder is grouped as "Other"
+MAX_CATEGORIES = 25
+
+# Occupancy gauges per row, and the height of each row in pixels
+GAUGE_COLUMNS = 4
+GAUGE_ROW_HEIGHT = 220
+GAUGE_PAGE_SIZES = (8, 12, 24, 48)
+
+# Above this many shows the occupancy distribution is shown instead of gauges by default
+GAUGE_VIEW_THRESHOLD = 24
+
+# Occupancy bands shared by the gauges and the distribution chart
+OCCUPANCY_BANDS = [(0, 50, "red"), (50, 75, "yellow"), (75, 100, "green")]
+
+# Width of each bar in the occupancy distribution, in percentage points
+OCCUPANCY_BIN = 5
+
+
+class FigureCache:
+    """The latest figure for each chart, rebuilt when its data version changes."""
+
+    def __init__(self, size=FIGURE_CACHE_SIZE):
+        self.size = size
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """The figure for ``key`` built from data at ``version``, calling ``build()`` if needed."""
+        with self._lock:
+            cached = self._figures.get(key)
+            if cached is not None and cached[0] == version:
+                self._figures.move_to_end(key)
+                return cached[1]
+        figure = build()
+        with self._lock:
+            self._figures[key] = (version, figure)
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.size:
+                self._figures.popitem(last=False)
+        return figure
+
+
+def top_categories(df, label, value, limit=MAX_CATEGORIES):
+    """The ``limit - 1`` largest rows of ``df`` by ``value``, with the rest summed into one "Other" row."""
+    if len(df) <= limit:
+        return df
+    df = df.sort_values(value, ascending=False)
+    head, rest = df.iloc[:limit - 1], df.iloc[limit - 1:]
+    other = {label: f"Other ({len(rest)})", value: rest[value].sum()}
+    return pd.concat([head, pd.DataFrame([other])], ignore_index=True)
+
+
+def downsample(df, x, y, max_points=MAX_POINTS):
+    """At most ``max_points`` rows of ``df``: the lowest and highest ``y`` in each ``x`` bucket."""
+    if len(df) <= max_points:
+        return df
+    df = df.sort_values(x, kind="stable")
+    buckets = np.arange(len(df)) * (max_points // 2) // len(df)
+    values = df[y].to_numpy()
+    grouped = pd.Series(values).groupby(buckets)
+    keep = np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+    return df.iloc[keep]
+
+
+def venue_figure(venues):
+    df = top_categories(pd.DataFrame(venues, columns=Venue._fields), "name", "capacity")
+    fig = px.bar(
+        df,
+        x="name",
+        y="capacity",
+        color="rental_fee",
+        labels={"name": "Venue", "capacity": "Capacity", "rental_fee": "Rental Fee ($)"},
+        title="Venue Capacity and Rental Fees",
+        color_continuous_scale="Viridis"
+    )
+    fig.update_layout(
+        xaxis_title="Venue",
+        yaxis_title="Capacity",
+        coloraxis_colorbar_title="Rental Fee ($)"
+    )
+    return fig
+
+
+def revenue_figure(shows_df):
+    """Revenue per show: bars for a handful of shows, a WebGL scatter over time for many."""
+    labels = {"title": "Show", "date": "Date", "revenue": "Revenue ($)", "occupancy_rate": "Occupancy Rate (%)"}
+    if len(shows_df) <= WEBGL_THRESHOLD:
+        fig = px.bar(
+            shows_df,
+            x="title",
+            y="revenue",
+            color="occupancy_rate",
+            labels=labels,
+            title="Revenue by Show",
+            color_continuous_scale="RdYlGn"
+        )
+        xaxis_title = "Show"
+    else:
+        df = downsample(shows_df[["title", "date", "revenue", "occupancy_rate"]], "date", "revenue")
+        fig = px.scatter(
+            df,
+            x="date",
+            y="revenue",
+            color="occupancy_rate",
+            hover_name="title",
+            labels=labels,
+            title=f"Revenue by Show ({len(shows_df):,} shows)",
+            color_continuous_scale="RdYlGn",
+            render_mode="webgl"
+        )
+        xaxis_title = "Date"
+    fig.update_layout(
+        xaxis_title=xaxis_title,
+        yaxis_title="Revenue ($)",
+        coloraxis_colorbar_title="Occupancy (%)"
+    )
+    return fig
+
+
+def gauge_figure(shows_df):
+    """One occupancy gauge per show, laid out :data:`GAUGE_COLUMNS` to a row.
+
+    Meant for one page of shows at a time; see :func:`occupancy_figure` for all of them.
+    """
+    rows = max(1, -(-len(shows_df) // GAUGE_COLUMNS))
+    fig = go.Figure()
+    for position, show in enumerate(shows_df.itertuples()):
+        fig.add_trace(go.Indicator(
+            mode="gauge+number",
+            value=show.occupancy_rate,
+            number={"suffix": "%", "valueformat": ".0f"},
+            title={"text": show.title},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "darkblue"},
+                "steps": [{"range": [low, high], "color": color} for low, high, color in OCCUPANCY_BANDS],
+                "threshold": {
+                    "line": {"color": "black", "width": 4},
+                    "thickness": 0.75,
+                    "value": 90
+                }
+            },
+            domain={"row": position // GAUGE_COLUMNS, "column": position % GAUGE_COLUMNS}
+        ))
+    fig.update_layout(
+        grid={"rows": rows, "columns": GAUGE_COLUMNS, "pattern": "independent"},
+        height=rows * GAUGE_ROW_HEIGHT
+    )
+    return fig
+
+
+def occupancy_figure(shows_df):
+    """How many shows fall in each occupancy bucket.
+
+    Shows are binned here rather than by plotly, so the figure is the same
+    size for 5 shows or 5,000.
+    """
+    edges = np.arange(0, 100 + OCCUPANCY_BIN, OCCUPANCY_BIN)
+    counts, _ = np.histogram(np.clip(shows_df["occupancy_rate"].to_numpy(dtype=float), 0, 100), bins=edges)
+    lows = edges[:-1]
+    colors = [next(color for low, high, color in OCCUPANCY_BANDS if start < high) for start in lows]
+    fig = go.Figure(go.Bar(
+        x=lows + OCCUPANCY_BIN / 2,
+        y=counts,
+        width=OCCUPANCY_BIN,
+        marker_color=colors,
+        customdata=np.column_stack([lows, lows + OCCUPANCY_BIN]),
+        hovertemplate="%{customdata[0]:.0f}–%{customdata[1]:.0f}%: %{y} shows<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"Occupancy across {len(shows_df):,} shows",
+        xaxis={"title": "Occupancy (%)", "range": [0, 100]},
+        yaxis_title="Shows",
+        bargap=0.05
+    )
+    return fig
+
+
+def popularity_figure(comedian_df):
+    fig = px.pie(
+        top_categories(comedian_df, "name", "shows"),
+        values="shows",
+        names="name",
+        title="Shows per Comedian",
+        hole=0.4
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    return fig
+
+
+def period_figure(timeline_df, freq):
+    """Revenue per day, week or month, coloured by occupancy."""
+    fig = px.bar(
+        timeline_df,
+        x="period",
+        y="revenue",
+        color="occupancy_rate",
+        labels={"period": freq.title(), "revenue": "Revenue ($)", "occupancy_rate": "Occupancy Rate (%)"},
+        title=f"Revenue per {freq.title()}",
+        color_continuous_scale="RdYlGn",
+        range_color=(0, 100)
+    )
+    fig.update_layout(xaxis_title=freq.title(), yaxis_title="Revenue ($)")
+    return fig
+
+
+def forecast_figure(forecast_df, horizon):
+    fig = px.line(
+        forecast_df,
+        x="date",
+        y="revenue",
+        color="type",
+        labels={"date": "Date", "revenue": "Revenue ($)", "type": "Type"},
+        title=f"Revenue Forecast (Next {horizon} Weeks)",
+        markers=True
+    )
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Revenue ($)"
+    )
+    return fig
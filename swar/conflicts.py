@@ -0,0 +1,162 @@
+"""Double-booking detection for venues and comedians.
+
+Every venue and every comedian has a calendar: a list of ``(start, end,
+show_id)`` intervals kept sorted by start time, in minutes since the epoch.
+An overlap query only has to look at intervals starting between
+``start - longest_show`` and ``end``, which two binary searches find, so
+checking a booking costs O(log n + k) for k nearby shows rather than a scan
+of the season.
+"""
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import datetime
+
+from swar.incremental import IncrementalCache
+
+# How far either side of the requested time to look for a free slot
+SEARCH_DAYS = 7
+
+Conflict = namedtuple("Conflict", ["kind", "resource_id", "show_id", "start", "end"])
+
+
+def to_minutes(value):
+    return int(value.timestamp() // 60)
+
+
+def from_minutes(value):
+    return datetime.fromtimestamp(value * 60)
+
+
+class Calendar:
+    """Sorted, possibly overlapping bookings of a single venue or comedian."""
+
+    def __init__(self):
+        self._entries = []
+        self._longest = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, start, end, show_id):
+        insort(self._entries, (start, end, show_id))
+        self._longest = max(self._longest, end - start)
+
+    def remove(self, start, end, show_id):
+        index = bisect_left(self._entries, (start, end, show_id))
+        if index < len(self._entries) and self._entries[index] == (start, end, show_id):
+            del self._entries[index]
+
+    def overlapping(self, start, end):
+        """Bookings that intersect the half-open interval ``[start, end)``."""
+        lo = bisect_left(self._entries, (start - self._longest,))
+        hi = bisect_left(self._entries, (end,))
+        return [entry for entry in self._entries[lo:hi] if entry[1] > start]
+
+
+class ConflictDetector(IncrementalCache):
+    """Per-venue and per-comedian calendars, kept in sync with a Repository."""
+
+    TABLES = ("shows", "comedians")
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    # Maintenance
+
+    def add(self, show_id, start, end, venue_id, comedian_ids):
+        with self._lock:
+            self.remove(show_id)
+            self._shows[show_id] = (start, end, venue_id, tuple(comedian_ids))
+            self._venues.setdefault(venue_id, Calendar()).add(start, end, show_id)
+            for comedian_id in comedian_ids:
+                self._comedians.setdefault(comedian_id, Calendar()).add(start, end, show_id)
+
+    def remove(self, show_id):
+        with self._lock:
+            booking = self._shows.pop(show_id, None)
+            if booking is None:
+                return
+            start, end, venue_id, comedian_ids = booking
+            self._venues[venue_id].remove(start, end, show_id)
+            for comedian_id in comedian_ids:
+                calendar = self._comedians.get(comedian_id)
+                if calendar is not None:
+                    calendar.remove(start, end, show_id)
+
+    def add_show(self, show):
+        start = to_minutes(show.date)
+        self.add(show.id, start, start + show.duration_minutes, show.venue_id, show.comedian_ids)
+
+    def _apply(self, repo, changes):
+        super()._apply(repo, changes)
+        for _, table, op, row_id in changes:
+            if table == "comedians" and op == "delete":
+                # Their lineup entries were removed with them
+                self._comedians.pop(row_id, None)
+
+    def _reset(self):
+        self._venues, self._comedians, self._shows = {}, {}, {}
+
+    def _set(self, show_id, show):
+        if show is None:
+            self.remove(show_id)
+        else:
+            self.add_show(show)
+
+    # Queries
+
+    def find_conflicts(self, date, duration_minutes, venue_id, comedian_ids, ignore_show_id=None):
+        """Bookings that clash with a show at ``venue_id`` with ``comedian_ids``.
+
+        Pass ``venue_id=None`` or no comedians to check only one side.
+        """
+        start = to_minutes(date)
+        return self._conflicts(start, start + duration_minutes, venue_id, comedian_ids, ignore_show_id)
+
+    def _conflicts(self, start, end, venue_id, comedian_ids, ignore_show_id=None):
+        with self._lock:
+            calendars = [("venue", venue_id, self._venues.get(venue_id))]
+            calendars += [("comedian", comedian_id, self._comedians.get(comedian_id)) for comedian_id in comedian_ids]
+            return [
+                Conflict(kind, resource_id, show_id, from_minutes(booked_start), from_minutes(booked_end))
+                for kind, resource_id, calendar in calendars if calendar is not None
+                for booked_start, booked_end, show_id in calendar.overlapping(start, end)
+                if show_id != ignore_show_id
+            ]
+
+    def suggest_slots(self, date, duration_minutes, venue_id, comedian_ids, count=3, not_before=None):
+        """Free start times closest to ``date`` for the same venue and lineup.
+
+        Candidates are the nearest gap before and after the requested time and
+        the same time of day on the following days, nearest first.
+        """
+        requested = to_minutes(date)
+        earliest = to_minutes(not_before or datetime.now())
+        limit = SEARCH_DAYS * 24 * 60
+        candidates = {
+            self._walk(requested, duration_minutes, venue_id, comedian_ids, forward=True, limit=limit),
+            self._walk(requested, duration_minutes, venue_id, comedian_ids, forward=False, limit=limit)
+        }
+        for day in range(1, SEARCH_DAYS + 1):
+            start = requested + day * 24 * 60
+            if not self._conflicts(start, start + duration_minutes, venue_id, comedian_ids):
+                candidates.add(start)
+        slots = sorted(
+            (start for start in candidates if start is not None and start >= earliest and start != requested),
+            key=lambda start: abs(start - requested)
+        )
+        return [from_minutes(start) for start in slots[:count]]
+
+    def _walk(self, start, duration, venue_id, comedian_ids, forward, limit):
+        """Step past clashing bookings until the slot is free or ``limit`` is hit."""
+        origin = start
+        while abs(start - origin) <= limit:
+            clashes = self._conflicts(start, start + duration, venue_id, comedian_ids)
+            if not clashes:
+                return start
+            if forward:
+                start = max(to_minutes(clash.end) for clash in clashes)
+            else:
+                start = min(to_minutes(clash.start) for clash in clashes) - duration
+        return None
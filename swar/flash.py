@@ -0,0 +1,20 @@
+"""Flash messages that survive a rerun.
+
+Handlers that change data call :func:`flash` and rerun straight away instead
+of sleeping so that a ``st.success`` stays on screen; the next run shows the
+queued messages as toasts.
+"""
+import streamlit as st
+
+FLASH_KEY = "_flash_messages"
+
+
+def flash(message, icon="✅"):
+    """Queue a toast to be shown on the next run of this session."""
+    st.session_state.setdefault(FLASH_KEY, []).append((message, icon))
+
+
+def show_flashes():
+    """Show and clear every queued toast."""
+    for message, icon in st.session_state.pop(FLASH_KEY, []):
+        st.toast(message, icon=icon)
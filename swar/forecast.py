@@ -0,0 +1,212 @@
+"""Weekly revenue forecasts fitted on the ticket sales log.
+
+Sales are bucketed into weeks starting on Monday, for every series the
+Analytics page can forecast: all shows together, each venue and each
+comedian (a show's revenue counts towards every comedian in its lineup).
+Holt's linear exponential smoothing then runs over all series at once as
+array operations, for a small grid of smoothing parameters, and each series
+keeps the parameters with the lowest one-step-ahead error.
+
+Only complete weeks are fitted and the smoothing state is kept between
+refreshes. New sales are added to their week, and the fit advances one step
+when a week closes. It is refitted from scratch only when history is
+rewritten: a backdated or bulk-imported sale, a cancelled show, or a removed
+comedian or venue.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from swar.incremental import IncrementalCache
+
+# Smoothing parameters tried for every series: level (alpha) x trend (beta)
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+BETAS = (0.05, 0.2, 0.4)
+
+MIN_HORIZON_WEEKS = 8
+MAX_HORIZON_WEEKS = 52
+
+# Complete weeks of actual revenue shown ahead of the forecast
+HISTORY_WEEKS = 12
+
+# Series key for revenue across all shows; the others are ("venue", id) and ("comedian", id)
+TOTAL = ("total", None)
+
+
+def week_start(value):
+    """Midnight on the Monday of the week containing ``value``."""
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def series_keys(show):
+    return [TOTAL, ("venue", show.venue_id)] + [("comedian", c) for c in show.comedian_ids]
+
+
+class RevenueForecaster(IncrementalCache):
+    """Holt forecasts of weekly revenue per series, kept in sync with a Repository and the calendar."""
+
+    TABLES = ("shows", "sales")
+    REBUILD_ON = {("comedians", "delete"), ("venues", "delete")}
+
+    def __init__(self):
+        super().__init__()
+        self.origin = week_start(datetime.now())
+        self._alpha = np.repeat(ALPHAS, len(BETAS))[:, None]
+        self._beta = np.tile(BETAS, len(ALPHAS))[:, None]
+        self._reset([TOTAL], 1)
+
+    def _reset(self, keys, weeks):
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._shows = {}
+        self._weeks = np.zeros((len(keys), weeks))
+        self._fitted = 0
+        self._level, self._trend, self._sse = (np.zeros((len(self._alpha), len(keys))) for _ in range(3))
+        self._last_sale = 0
+        self._forecasts = {}
+
+    def can_patch(self, repo, changes):
+        if not super().can_patch(repo, changes):
+            return False
+        for _, table, _, row_id in changes:
+            if table != "shows":
+                continue
+            show = repo.get_show(row_id)
+            if show is None:
+                # Cancelled, and its sales went with it
+                return False
+            known = self._shows.get(row_id)
+            if known is not None and known != [self._rows.get(key) for key in series_keys(show)]:
+                # Moved venue or new lineup, so its past revenue belongs to other series
+                return False
+        # A backdated or imported sale lands in a week that is already fitted
+        sales = repo.sales_since(self._last_sale) if self._shows else []
+        return not sales or self._week(datetime.fromisoformat(min(sale[2] for sale in sales))) >= self._fitted
+
+    def _up_to_date(self, repo):
+        return self.version == repo.version and self._fitted == self._week(datetime.now())
+
+    def _updated(self):
+        self._advance(self._week(datetime.now()))
+        self._forecasts = {}
+
+    def _week(self, value):
+        return (value - self.origin).days // 7
+
+    def _rebuild(self, repo):
+        shows = repo.list_shows()
+        keys = list(dict.fromkeys(key for show in shows for key in series_keys(show))) or [TOTAL]
+        sales = repo.sales_since(0)
+        now = datetime.now()
+        self.origin = week_start(min(datetime.fromisoformat(min(sale[2] for sale in sales)), now) if sales else now)
+        self._reset(keys, self._week(now) + 1)
+        for show in shows:
+            self._shows[show.id] = [self._rows[key] for key in series_keys(show)]
+        self._add_sales(sales)
+
+    def _apply(self, repo, changes):
+        """Fold ``changes`` into the weekly totals; return False if a refit is needed."""
+        for _, table, _, row_id in changes:
+            show = repo.get_show(row_id) if table == "shows" else None
+            if show is not None:
+                self._shows.setdefault(row_id, [self._row(key) for key in series_keys(show)])
+        return self._add_sales(repo.sales_since(self._last_sale))
+
+    def _row(self, key):
+        """The row for ``key``, added with an empty history if it is new."""
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._rows)
+            self._weeks = np.vstack([self._weeks, np.zeros((1, self._weeks.shape[1]))])
+            self._level, self._trend, self._sse = (
+                np.hstack([state, np.zeros((len(self._alpha), 1))])
+                for state in (self._level, self._trend, self._sse)
+            )
+        return row
+
+    def _add_sales(self, sales):
+        """Add ``sales`` to their weeks; return False if any lands in an already fitted week."""
+        if not sales or not self._shows:
+            return True
+        ids, show_ids, sold_at, revenue = zip(*sales)
+        self._last_sale = ids[-1]
+        elapsed = np.array(sold_at, dtype="datetime64[s]") - np.datetime64(self.origin, "s")
+        weeks = elapsed // np.timedelta64(7, "D")
+        if weeks.min() < self._fitted:
+            return False
+        self._grow(weeks.max() + 1)
+
+        # Every sale counts towards each of its show's series
+        known = np.array(sorted(self._shows), dtype=np.int64)
+        series = [self._shows[show_id] for show_id in known.tolist()]
+        counts = np.fromiter((len(rows) for rows in series), dtype=np.int64, count=len(series))
+        flat_rows = np.fromiter((row for rows in series for row in rows), dtype=np.int64, count=counts.sum())
+        starts = np.cumsum(counts) - counts
+        show_ids = np.array(show_ids, dtype=np.int64)
+        position = np.minimum(np.searchsorted(known, show_ids), len(known) - 1)
+        sale_counts = np.where(known[position] == show_ids, counts[position], 0)
+        first = np.repeat(starts[position] - (np.cumsum(sale_counts) - sale_counts), sale_counts)
+        rows = flat_rows[first + np.arange(sale_counts.sum())]
+        flat = rows * self._weeks.shape[1] + np.repeat(weeks, sale_counts)
+        self._weeks += np.bincount(
+            flat, weights=np.repeat(np.array(revenue, dtype=float), sale_counts), minlength=self._weeks.size
+        ).reshape(self._weeks.shape)
+        return True
+
+    def _grow(self, weeks):
+        if weeks > self._weeks.shape[1]:
+            extra = np.zeros((self._weeks.shape[0], weeks - self._weeks.shape[1]))
+            self._weeks = np.hstack([self._weeks, extra])
+
+    def _advance(self, current):
+        """Run the smoothing over every complete week before ``current``, for all series and parameters."""
+        self._grow(current + 1)
+        alpha, beta = self._alpha, self._beta
+        level, trend, sse = self._level, self._trend, self._sse
+        for week in range(self._fitted, current):
+            actual = self._weeks[:, week]
+            if week == 0:
+                level = np.broadcast_to(actual, level.shape).copy()
+                continue
+            expected = level + trend
+            error = actual - expected
+            sse = sse + error * error
+            new_level = alpha * actual + (1 - alpha) * expected
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            level = new_level
+        self._level, self._trend, self._sse = level, trend, sse
+        self._fitted = max(self._fitted, current)
+
+    # Queries
+
+    def _forecast_all(self, horizon):
+        """Forecast revenue for every series, one row per series and one column per week."""
+        forecast = self._forecasts.get(horizon)
+        if forecast is None:
+            best = self._sse.argmin(axis=0)
+            series = np.arange(self._sse.shape[1])
+            steps = np.arange(1, horizon + 1)
+            level, trend = self._level[best, series], self._trend[best, series]
+            forecast = self._forecasts[horizon] = np.maximum(level[:, None] + trend[:, None] * steps, 0)
+        return forecast
+
+    def forecast(self, key=TOTAL, horizon=MIN_HORIZON_WEEKS, history=HISTORY_WEEKS):
+        """Weekly revenue for ``key``: up to ``history`` complete weeks of actuals, then ``horizon`` forecast weeks.
+
+        The first forecast week is the current, still open, week.
+        """
+        horizon = min(max(horizon, MIN_HORIZON_WEEKS), MAX_HORIZON_WEEKS)
+        with self._lock:
+            row = self._rows.get(key)
+            first = max(self._fitted - history, 0)
+            if row is None:
+                actual, forecast = np.zeros(self._fitted - first), np.zeros(horizon)
+            else:
+                actual, forecast = self._weeks[row, first:self._fitted], self._forecast_all(horizon)[row]
+            weeks = np.arange(first, self._fitted + horizon)
+            return pd.DataFrame({
+                "date": [self.origin + timedelta(weeks=int(week)) for week in weeks],
+                "revenue": np.concatenate([actual, forecast]),
+                "type": ["Actual"] * len(actual) + ["Forecast"] * horizon
+            })
@@ -0,0 +1,89 @@
+"""Shared refresh logic for the caches derived from the repository.
+
+Every cache remembers the repository version it was built from. On refresh
+it replays ``repo.changes_since`` that version and patches itself in
+:meth:`IncrementalCache._apply`, or starts over in
+:meth:`IncrementalCache._rebuild` when patching is not possible: the log no
+longer reaches back, more than :data:`MAX_DELTA_CHANGES` changes to the
+tables the cache follows are pending, or :meth:`IncrementalCache.can_patch`
+turns them down for another reason.
+
+Most caches hold one contribution per show. For those, ``_set(show_id,
+show)`` replaces the contribution of ``show_id`` with that of ``show`` (None
+when it was deleted), and the default ``_apply`` and ``_rebuild`` are built
+on it.
+"""
+import threading
+
+# Above this many pending changes a rebuild is cheaper than patching
+MAX_DELTA_CHANGES = 1000
+
+
+class IncrementalCache:
+    """Base for caches kept in sync with a Repository through its change log."""
+
+    # Tables whose changes the cache applies; others are ignored
+    TABLES = ("shows",)
+
+    # (table, op) changes that can only be taken in by a rebuild, such as a
+    # removed comedian, who leaves every lineup they were in
+    REBUILD_ON = ()
+
+    def __init__(self):
+        self.version = None
+        self._lock = threading.RLock()
+
+    def refresh(self, repo):
+        """Bring the cache up to ``repo.version`` and return it."""
+        with self._lock:
+            if self._up_to_date(repo):
+                return self
+            version = repo.version
+            changes = self._pending(repo)
+            if changes is None or not self.can_patch(repo, changes) or self._apply(repo, changes) is False:
+                self._rebuild(repo)
+            self._updated()
+            self.version = version
+            return self
+
+    def needs_rebuild(self, repo):
+        """Whether the next :meth:`refresh` starts over rather than patching."""
+        with self._lock:
+            if self._up_to_date(repo):
+                return False
+            changes = self._pending(repo)
+            return changes is None or not self.can_patch(repo, changes)
+
+    def can_patch(self, repo, changes):
+        """Whether ``changes`` can be applied in place rather than by a rebuild."""
+        followed = [change for change in changes if change[1] in self.TABLES]
+        return len(followed) <= MAX_DELTA_CHANGES and not any(
+            (table, op) in self.REBUILD_ON for _, table, op, _ in changes
+        )
+
+    def _up_to_date(self, repo):
+        return self.version == repo.version
+
+    def _pending(self, repo):
+        return None if self.version is None else repo.changes_since(self.version)
+
+    def _updated(self):
+        """Called after every patch or rebuild, for state derived from the whole cache."""
+
+    # Per-show contributions
+
+    def _apply(self, repo, changes):
+        """Patch the cache from ``changes``; may return False if it turns out a rebuild is needed."""
+        for show_id in dict.fromkeys(row_id for _, table, _, row_id in changes if table == "shows"):
+            self._set(show_id, repo.get_show(show_id))
+
+    def _rebuild(self, repo):
+        self._reset()
+        for show in repo.list_shows():
+            self._set(show.id, show)
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _set(self, show_id, show):
+        raise NotImplementedError
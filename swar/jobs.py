@@ -0,0 +1,170 @@
+"""Background jobs for work too slow to do while a page waits.
+
+A :class:`JobRunner` (one per process, see
+:func:`swar.resources.get_job_runner`) runs jobs on a small thread pool and
+keeps a registry of them, so any session can look up a job by id and see
+how far it has got. Jobs run in threads rather than processes because most
+of them fill the caches that every session shares; SQLite, numpy and pandas
+release the GIL for much of that work, so a page rerun still gets the CPU
+in between.
+
+On a page, :func:`follow` shows a running job's progress with
+``st.progress``, refreshing on its own, and reruns the app once the job
+finishes so the page can use the result. :func:`refreshed` moves the full
+rebuild of an incremental cache (analytics, rollups, forecasts) off the
+rerun path, while cheap incremental refreshes still happen inline.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("SWAR_JOB_WORKERS", 2))
+
+# How often a page showing a running job checks on it
+POLL_SECONDS = 0.5
+
+# Finished jobs kept for sessions to collect their results
+KEEP_FINISHED = 50
+
+
+class Job:
+    """One piece of background work, with the progress it has reported and its outcome."""
+
+    def __init__(self, job_id, name, key=None):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.state = "queued"
+        self.progress = 0.0
+        self.message = "Waiting to start..."
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.state in ("done", "failed")
+
+    def update(self, progress=None, message=None):
+        """Report progress (0-1) and/or a status line; called from the job itself."""
+        if progress is not None:
+            self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+class JobRunner:
+    """Thread pool plus a registry of the jobs submitted to it."""
+
+    def __init__(self, workers=WORKERS, keep=KEEP_FINISHED):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swar-job")
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, key=None):
+        """Run ``fn(job)`` in the background and return its :class:`Job`.
+
+        ``fn`` may call ``job.update`` to report progress; its return value
+        becomes ``job.result``. While a job with the same ``key`` is still
+        queued or running, that job is returned instead of starting another.
+        """
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.done:
+                        return job
+            job = Job(next(self._ids), name, key)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id):
+        """The job with ``job_id``, or None if there is none (or it has been forgotten)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self, key):
+        """The most recently submitted job with ``key``, in any state, or None."""
+        with self._lock:
+            return next((job for job in reversed(self._jobs.values()) if job.key == key), None)
+
+    def active(self):
+        """Jobs that are queued or running, oldest first."""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
+
+    def _run(self, job, fn):
+        job.state = "running"
+        job.update(message="Running...")
+        try:
+            job.result = fn(job)
+        except Exception as error:
+            logger.exception("Job %s (%s) failed", job.id, job.name)
+            job.error = str(error) or type(error).__name__
+            job.state = "failed"
+        else:
+            job.update(1.0, "Done")
+            job.state = "done"
+        job.finished = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - self._keep, 0)]:
+            del self._jobs[job_id]
+
+
+def follow(job):
+    """Show a running ``job``'s progress until it finishes, then rerun the app.
+
+    Call only for jobs that are not done yet; read the result on the rerun.
+    """
+    if job.done:
+        return
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def poll():
+        if job.done:
+            st.rerun()
+        st.progress(job.progress, text=f"{job.name}: {job.message}")
+
+    poll()
+
+
+def refreshed(runner, name, cache, repo):
+    """``cache`` brought up to date with ``repo``, or None while its rebuild runs as a job.
+
+    Refreshes the cache can patch are cheap and happen inline. A rebuild
+    (the first build, a gap in the change log, or changes the cache can only
+    take in from scratch) runs in the background with its progress shown in
+    place, and every session asking meanwhile follows the same job. A failed
+    rebuild is reported, not retried, until the repository changes.
+    """
+    # While a rebuild holds the cache, even checking it would wait for the rebuild
+    running = next((job for job in runner.active() if job.key and job.key[:2] == ("refresh", name)), None)
+    if running is not None:
+        follow(running)
+        return None
+    if not cache.needs_rebuild(repo):
+        return cache.refresh(repo)
+    key = ("refresh", name, repo.version)
+    failed = runner.latest(key)
+    if failed is not None and failed.state == "failed":
+        st.error(f"Building {name} failed: {failed.error}")
+        return None
+    job = runner.submit(f"Building {name}", lambda job: cache.refresh(repo), key=key)
+    if not job.done:
+        follow(job)
+        return None
+    return refreshed(runner, name, cache, repo)
@@ -0,0 +1,64 @@
+"""Per-page interaction latency tracking.
+
+The app measures the time from when Streamlit starts handling an interaction
+(a click, a form submit) until the resulting page has finished rendering, and
+records it here. Samples are kept in a bounded window per page so that the
+sidebar can show p50/p95 against the configured budget.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MS = float(os.environ.get("SWAR_LATENCY_BUDGET_MS", 500))
+
+# Samples kept per page
+WINDOW_SIZE = 200
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Thread-safe rolling latency samples per page, checked against a budget."""
+
+    def __init__(self, budget_ms=DEFAULT_BUDGET_MS, window=WINDOW_SIZE):
+        self.budget_ms = budget_ms
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._over_budget = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, page, elapsed_ms):
+        """Store one sample; returns True if it stayed within the budget."""
+        within_budget = elapsed_ms <= self.budget_ms
+        with self._lock:
+            self._samples[page].append(elapsed_ms)
+            if not within_budget:
+                self._over_budget[page] += 1
+        if not within_budget:
+            logger.warning("%s rendered in %.0f ms (budget %.0f ms)", page, elapsed_ms, self.budget_ms)
+        return within_budget
+
+    def stats(self):
+        """One summary row per page, suitable for ``st.dataframe``."""
+        with self._lock:
+            snapshot = {page: list(samples) for page, samples in self._samples.items()}
+            over_budget = dict(self._over_budget)
+        return [
+            {
+                "page": page,
+                "samples": len(samples),
+                "p50_ms": round(percentile(samples, 0.5), 1),
+                "p95_ms": round(percentile(samples, 0.95), 1),
+                "max_ms": round(max(samples), 1),
+                "over_budget": over_budget.get(page, 0)
+            }
+            for page, samples in sorted(snapshot.items())
+        ]
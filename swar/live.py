@@ -0,0 +1,44 @@
+"""Keep every open session in step with the shared repository.
+
+All sessions read the same :class:`~swar.storage.Repository`, so a change is
+visible to everyone on their next run. :func:`watch` makes that run happen
+by itself: a small fragment polls the repository every
+:data:`POLL_SECONDS` and reruns the app only when one of the tables the
+current page displays has changed since the page was drawn. A poll that
+finds nothing new costs a dictionary lookup and never redraws the page.
+"""
+import os
+
+import streamlit as st
+
+POLL_SECONDS = float(os.environ.get("SWAR_POLL_SECONDS", 2))
+
+# Tables whose changes each page needs to redraw for
+PAGE_TABLES = {
+    "Dashboard": ("shows", "comedians", "venues"),
+    "Comedians": ("comedians", "shows"),
+    "Shows": ("shows", "comedians", "venues", "holds"),
+    "Venues": ("venues",),
+    "Analytics": ("shows", "comedians", "venues", "sales"),
+    "Data": ()
+}
+
+
+def watch(repo, page):
+    """Rerun this session when data shown on ``page`` is changed by another session or process.
+
+    Call before the page reads any data, so that nothing committed while it
+    renders can be missed.
+    """
+    tables = PAGE_TABLES.get(page, ())
+    if not tables or not POLL_SECONDS:
+        return
+    seen = repo.table_version(*tables)
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def poll():
+        repo.sync()
+        if repo.table_version(*tables) != seen:
+            st.rerun()
+
+    poll()
@@ -0,0 +1,22 @@
+"""Compact records for comedians, venues and shows.
+
+The repository keeps every row in memory, shared by all sessions, so rows
+are named tuples rather than dicts: no per-row hash table and no repeated
+keys. Shows refer to their venue and lineup by id instead of embedding
+names; resolve them through :meth:`Repository.get_venue` and
+:meth:`Repository.lineup`. That keeps a show the same size however long the
+names are, and renaming a comedian touches only that comedian. Titles are
+interned, so the shows of a recurring night share one string.
+
+Records are immutable: change data through the repository's write methods.
+"""
+from collections import namedtuple
+
+Comedian = namedtuple("Comedian", ["id", "name", "rating", "fee", "specialty"])
+
+Venue = namedtuple("Venue", ["id", "name", "capacity", "rental_fee"])
+
+Show = namedtuple("Show", [
+    "id", "title", "date", "venue_id", "capacity", "tickets_sold", "ticket_price", "duration_minutes", "comedian_ids"
+])
+
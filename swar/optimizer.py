@@ -0,0 +1,221 @@
+"""Lineup and venue optimizer.
+
+Given a date range, a budget and a target audience, proposes shows (date,
+venue, lineup) that maximise expected ticket revenue minus comedian fees and
+venue rental. The model is deliberately simple:
+
+* a lineup's draw is a blend of its headliner's and its average rating, with
+  a small bonus for covering several specialties;
+* expected attendance is the target audience scaled by that draw, capped by
+  the venue's capacity.
+
+Lineups are chosen with a knapsack-style branch and bound. Venues that are
+dominated (another is at least as big for no more money) and comedians
+dominated by a full lineup's worth of others of their specialty are pruned
+up front, the remaining pool is explored best-rated first, and any branch
+whose optimistic profit cannot beat the current top proposals is cut. Only comedians and venues free at the proposed time are considered.
+"""
+import heapq
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Weight of the headliner's rating versus the lineup average in a lineup's draw
+HEADLINER_WEIGHT = 0.7
+
+# Extra draw per additional specialty covered, relative to lineup size
+DIVERSITY_BONUS = 0.1
+
+# Lineups shortlisted per requested proposal before checking availability
+SHORTLIST_FACTOR = 4
+
+# Longest date range searched, in days
+MAX_RANGE_DAYS = 92
+
+Proposal = namedtuple(
+    "Proposal",
+    ["date", "venue", "comedians", "expected_attendance", "revenue", "cost", "profit"]
+)
+
+
+def draw(ratings, specialties):
+    """Share of the target audience a lineup is expected to attract (0-1.1)."""
+    headliner = max(ratings) / 5
+    average = sum(ratings) / len(ratings) / 5
+    diversity = 1 + DIVERSITY_BONUS * (len(set(specialties)) - 1) / len(ratings)
+    return (HEADLINER_WEIGHT * headliner + (1 - HEADLINER_WEIGHT) * average) * diversity
+
+
+def pareto_front(items, better, cheaper):
+    """Items not dominated by another that is at least as good and no more expensive."""
+    front = []
+    best_so_far = None
+    for item in sorted(items, key=lambda item: (cheaper(item), -better(item))):
+        if best_so_far is None or better(item) > best_so_far:
+            front.append(item)
+            best_so_far = better(item)
+    return front
+
+
+def candidate_pool(comedians, max_size, budget=None):
+    """Comedians worth considering for lineups of up to ``max_size``, best rated first.
+
+    A comedian is dropped only when ``max_size`` others of the same specialty
+    are each rated at least as high for no more money: one of those is then
+    always left out of any lineup they are in, and swapping them in keeps
+    the specialties and cannot lower the profit. Comedians whose fee alone
+    exceeds ``budget`` are dropped as well.
+    """
+    by_specialty = {}
+    for comedian in comedians:
+        if budget is None or comedian.fee <= budget:
+            by_specialty.setdefault(comedian.specialty, []).append(comedian)
+    pool = []
+    for group in by_specialty.values():
+        # Ratings of the best max_size comedians seen so far, cheapest first
+        best = []
+        for comedian in sorted(group, key=lambda c: (c.fee, -c.rating)):
+            if len(best) == max_size and best[0] >= comedian.rating:
+                continue
+            pool.append(comedian)
+            if len(best) < max_size:
+                heapq.heappush(best, comedian.rating)
+            else:
+                heapq.heapreplace(best, comedian.rating)
+    pool.sort(key=lambda c: (-c.rating, c.fee))
+    return pool
+
+
+def venue_pool(venues):
+    return pareto_front(venues, better=lambda v: v.capacity, cheaper=lambda v: v.rental_fee)
+
+
+class LineupSearch:
+    """Branch and bound over lineups for a fixed set of available comedians and venues."""
+
+    def __init__(self, comedians, venues, budget, audience, ticket_price, min_size, max_size, keep):
+        self.comedians = comedians
+        self.venues = venues
+        self.budget = budget
+        self.audience = audience
+        self.price = ticket_price
+        self.min_size = min_size
+        self.max_size = max_size
+        self.keep = keep
+        self.best = []
+        self._counter = 0
+        self._max_capacity = max((v.capacity for v in venues), default=0)
+        self._min_rental = min((v.rental_fee for v in venues), default=0)
+        # Cheapest way to fill the remaining slots from position i onwards
+        fees = sorted(c.fee for c in comedians)
+        self._cheapest_fill = [sum(fees[:n]) for n in range(max_size + 1)]
+
+    def run(self):
+        if self.comedians and self.venues:
+            self._branch(0, [], 0)
+        return sorted(self.best, reverse=True)
+
+    def _threshold(self):
+        return self.best[0][0] if len(self.best) >= self.keep else float("-inf")
+
+    def _branch(self, start, lineup, fees):
+        size = len(lineup)
+        if size >= self.min_size:
+            self._evaluate(lineup, fees)
+        if size == self.max_size:
+            return
+        for index in range(start, len(self.comedians)):
+            comedian = self.comedians[index]
+            new_fees = fees + comedian.fee
+            if new_fees + self._min_rental > self.budget:
+                continue
+            # Candidates are explored best-rated first, so nothing later can lift the headliner
+            headliner = max([c.rating for c in lineup] + [comedian.rating])
+            optimistic_draw = headliner / 5 * (1 + DIVERSITY_BONUS)
+            optimistic_revenue = self.price * min(self._max_capacity, self.audience * optimistic_draw)
+            still_needed = max(0, self.min_size - size - 1)
+            optimistic_cost = new_fees + self._cheapest_fill[still_needed] + self._min_rental
+            if optimistic_revenue - optimistic_cost <= self._threshold():
+                continue
+            lineup.append(comedian)
+            self._branch(index + 1, lineup, new_fees)
+            lineup.pop()
+
+    def _evaluate(self, lineup, fees):
+        demand = self.audience * draw([c.rating for c in lineup], [c.specialty for c in lineup])
+        for venue in self.venues:
+            cost = fees + venue.rental_fee
+            if cost > self.budget:
+                continue
+            attendance = int(min(venue.capacity, demand))
+            revenue = attendance * self.price
+            profit = revenue - cost
+            if profit <= self._threshold():
+                continue
+            self._counter += 1
+            entry = (profit, -self._counter, venue, tuple(lineup), attendance, revenue, cost)
+            if len(self.best) < self.keep:
+                heapq.heappush(self.best, entry)
+            else:
+                heapq.heapreplace(self.best, entry)
+
+
+def optimize(comedians, venues, start_date, end_date, budget, audience, ticket_price,
+             show_time=None, duration_minutes=120, detector=None, min_size=1, max_size=3, count=5,
+             progress=None):
+    """Ranked :class:`Proposal` list for shows between ``start_date`` and ``end_date``.
+
+    ``detector`` is an up-to-date :class:`~swar.conflicts.ConflictDetector`;
+    when given, only comedians and venues free for the whole show are used.
+    ``progress``, if given, is called with the share of dates searched (0-1).
+    """
+    show_time = show_time or datetime.min.time().replace(hour=20)
+    days = max(1, min((end_date - start_date).days + 1, MAX_RANGE_DAYS))
+    dates = [datetime.combine(start_date + timedelta(days=offset), show_time) for offset in range(days)]
+    pool = candidate_pool(comedians, max_size, budget)
+
+    def is_free(when, venue, lineup):
+        if detector is None:
+            return True
+        return not detector.find_conflicts(when, duration_minutes, venue.id, [c.id for c in lineup])
+
+    def proposal(when, entry):
+        profit, _, venue, lineup, attendance, revenue, cost = entry
+        return Proposal(when, venue, list(lineup), attendance, revenue, cost, profit)
+
+    # Best lineups ignoring availability, each placed on its earliest free date
+    proposals = []
+    shortlist = LineupSearch(
+        pool, venue_pool(venues), budget, audience, ticket_price, min_size, max_size, count * SHORTLIST_FACTOR
+    ).run()
+    for entry in shortlist:
+        when = next((when for when in dates if is_free(when, entry[2], entry[3])), None)
+        if when is not None:
+            proposals.append(proposal(when, entry))
+        if len(proposals) == count:
+            return proposals
+    if detector is None:
+        return proposals
+
+    # Heavily booked range: search again per date using only who is free then
+    seen = {(p.venue.id, tuple(c.id for c in p.comedians)) for p in proposals}
+    searches = {}
+    for done, when in enumerate(dates):
+        if progress is not None:
+            progress(done / len(dates))
+        free_comedians = [c for c in pool if not detector.find_conflicts(when, duration_minutes, None, [c.id])]
+        free_venues = venue_pool([v for v in venues if not detector.find_conflicts(when, duration_minutes, v.id, [])])
+        # Dates with the same availability share one search
+        signature = (tuple(c.id for c in free_comedians), tuple(v.id for v in free_venues))
+        if signature not in searches:
+            searches[signature] = LineupSearch(
+                free_comedians, free_venues, budget, audience, ticket_price, min_size, max_size, count
+            ).run()
+        for entry in searches[signature]:
+            key = (entry[2].id, tuple(c.id for c in entry[3]))
+            # Keep the earliest date for each venue and lineup
+            if key not in seen:
+                seen.add(key)
+                proposals.append(proposal(when, entry))
+
+    proposals.sort(key=lambda p: (-p.profit, p.date))
+    return proposals[:count]
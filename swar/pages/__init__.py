@@ -0,0 +1,40 @@
+"""The app's pages, imported the first time each is opened.
+
+Every page is a module in this package with a ``render(repo)`` function.
+:data:`PAGES` lists them in sidebar order; :func:`render` imports a page's
+module on its first visit, so a process only loads what the pages it has
+served need. pandas and plotly come in with the charting and analytics
+pages, not with the app, and a container that only ever serves the roster
+never imports them.
+"""
+import importlib
+
+import streamlit as st
+
+# Page name -> sidebar icon, in sidebar order; the module is the lowercased name
+PAGES = {
+    "Dashboard": "📊",
+    "Comedians": "🎤",
+    "Shows": "🗓️",
+    "Venues": "🏢",
+    "Analytics": "📈",
+    "Data": "🗄️"
+}
+
+DEFAULT_PAGE = "Dashboard"
+
+
+def render(page, repo):
+    """Draw ``page`` (a key of :data:`PAGES`), importing its module on first use."""
+    importlib.import_module(f"{__name__}.{page.lower()}").render(repo)
+
+
+def change_page(page):
+    """Button callback: switch pages before the script reruns."""
+    st.session_state.page = page
+
+
+def rerun():
+    """Rerun now, timing the next render as part of the current interaction."""
+    st.session_state.interaction_started = st.session_state.run_started
+    st.rerun()
@@ -0,0 +1,166 @@
+"""Analytics: revenue, occupancy, comedian popularity, period reports and the revenue forecast."""
+from datetime import datetime
+
+import streamlit as st
+
+from swar.charts import (
+    GAUGE_PAGE_SIZES, GAUGE_VIEW_THRESHOLD, forecast_figure, gauge_figure, occupancy_figure, period_figure,
+    popularity_figure, revenue_figure
+)
+from swar.forecast import MAX_HORIZON_WEEKS, MIN_HORIZON_WEEKS, TOTAL, week_start
+from swar.jobs import refreshed
+from swar.pagination import paginate, view_mode
+from swar.resources import get_analytics, get_figure_cache, get_forecaster, get_job_runner, get_rollups
+from swar.rollups import FREQUENCIES
+
+# Columns of the per-venue and per-comedian period tables
+PERIOD_COLUMNS = {
+    "shows": st.column_config.NumberColumn("Shows"),
+    "tickets": st.column_config.NumberColumn("Tickets"),
+    "revenue": st.column_config.NumberColumn("Revenue", format="$%.0f"),
+    "occupancy_rate": st.column_config.ProgressColumn("Occupancy", format="%.0f%%", min_value=0, max_value=100)
+}
+
+
+def render(repo):
+    """Draw the analytics page."""
+    st.markdown("<h1 class='main-header'>Analytics</h1>", unsafe_allow_html=True)
+
+    # DataFrames for analysis, patched incrementally from the repository change log;
+    # a full build runs in the background and the page fills in once it is done
+    analytics = refreshed(get_job_runner(), "show analytics", get_analytics(), repo)
+    if analytics is None:
+        return
+    shows_df = analytics.shows_df
+
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        total_revenue = shows_df["revenue"].sum()
+        st.markdown(f"<div class='metric-card'><h2>${total_revenue:,.2f}</h2><p>Total Revenue</p></div>", unsafe_allow_html=True)
+
+    with col2:
+        avg_occupancy = shows_df["occupancy_rate"].mean()
+        st.markdown(f"<div class='metric-card'><h2>{avg_occupancy:.1f}%</h2><p>Avg. Occupancy</p></div>", unsafe_allow_html=True)
+
+    with col3:
+        total_shows = len(shows_df)
+        st.markdown(f"<div class='metric-card'><h2>{total_shows}</h2><p>Total Shows</p></div>", unsafe_allow_html=True)
+
+    with col4:
+        total_tickets = shows_df["tickets_sold"].sum()
+        st.markdown(f"<div class='metric-card'><h2>{total_tickets}</h2><p>Tickets Sold</p></div>", unsafe_allow_html=True)
+
+    # Revenue by show
+    st.markdown("<h2 class='sub-header'>Revenue by Show</h2>", unsafe_allow_html=True)
+
+    fig = get_figure_cache().get("revenue", analytics.version, lambda: revenue_figure(shows_df))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Occupancy rates
+    st.markdown("<h2 class='sub-header'>Occupancy Rates</h2>", unsafe_allow_html=True)
+
+    # A page of gauges at a time, or one binned chart for any number of shows
+    occupancy_view = view_mode("occupancy", len(shows_df), options=("Gauges", "Distribution"), threshold=GAUGE_VIEW_THRESHOLD)
+    if occupancy_view == "Gauges":
+        start, stop = paginate("occupancy", len(shows_df), page_sizes=GAUGE_PAGE_SIZES)
+        fig = get_figure_cache().get(
+            ("gauges", start, stop),
+            analytics.version,
+            lambda: gauge_figure(analytics.upcoming().iloc[start:stop])
+        )
+    else:
+        fig = get_figure_cache().get("occupancy", analytics.version, lambda: occupancy_figure(shows_df))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Comedian popularity
+    st.markdown("<h2 class='sub-header'>Comedian Popularity</h2>", unsafe_allow_html=True)
+
+    # Shows per comedian are counted incrementally by the analytics cache
+    comedian_df = analytics.comedian_df()
+
+    if not comedian_df.empty:
+        fig = get_figure_cache().get("popularity", analytics.version, lambda: popularity_figure(comedian_df))
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No data available for comedian popularity chart.")
+
+    # Any date range, read from the day/week/month rollups rather than the shows
+    st.markdown("<h2 class='sub-header'>Revenue by Period</h2>", unsafe_allow_html=True)
+    period_report(repo)
+
+    # Revenue forecast
+    st.markdown("<h2 class='sub-header'>Revenue Forecast</h2>", unsafe_allow_html=True)
+
+    # Weekly revenue fitted on the sales log, for all shows or one venue or comedian
+    series = [TOTAL] + [("venue", v.id) for v in repo.list_venues()] + [("comedian", c.id) for c in repo.list_comedians()]
+    col1, col2 = st.columns(2)
+    with col1:
+        key = st.selectbox(
+            "Forecast for",
+            series,
+            format_func=lambda k: "All shows" if k == TOTAL else
+                (repo.get_venue(k[1]) if k[0] == "venue" else repo.get_comedian(k[1])).name
+        )
+    with col2:
+        horizon = st.slider("Weeks ahead", MIN_HORIZON_WEEKS, MAX_HORIZON_WEEKS, MIN_HORIZON_WEEKS)
+
+    # Fitting from scratch takes a while on a long sales log, so it runs as a job
+    forecaster = refreshed(get_job_runner(), "revenue forecast", get_forecaster(), repo)
+    if forecaster is not None:
+        # The fit also moves on when a week closes
+        fig = get_figure_cache().get(
+            ("forecast", key, horizon),
+            (forecaster.version, week_start(datetime.now())),
+            lambda: forecast_figure(forecaster.forecast(key, horizon), horizon)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def period_report(repo):
+    rollups = refreshed(get_job_runner(), "period rollups", get_rollups(), repo)
+    if rollups is None:
+        return
+    span = rollups.span()
+    if span is None:
+        st.info("No shows scheduled yet.")
+        return
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        period = st.date_input("Period", value=span, key="analytics_period")
+    with col2:
+        freq = st.radio("Group by", FREQUENCIES, index=1, horizontal=True, format_func=str.title, key="analytics_freq")
+    # A range is only complete once its end date has been picked
+    start, end = period if len(period) == 2 else (period[0], period[0])
+
+    totals = rollups.totals(start, end)
+    revenue, tickets, occupancy, shows = (
+        (totals["revenue"].iloc[0], totals["tickets"].iloc[0], totals["occupancy_rate"].iloc[0], totals["shows"].iloc[0])
+        if not totals.empty else (0, 0, 0, 0)
+    )
+    for col, value, label in zip(
+        st.columns(4),
+        (f"${revenue:,.2f}", f"{occupancy:.1f}%", shows, tickets),
+        ("Revenue", "Occupancy", "Shows", "Tickets Sold")
+    ):
+        col.markdown(f"<div class='metric-card'><h2>{value}</h2><p>{label}</p></div>", unsafe_allow_html=True)
+
+    fig = get_figure_cache().get(
+        ("period", start, end, freq),
+        rollups.version,
+        lambda: period_figure(rollups.timeline(start, end, freq), freq)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    for col, kind, label, lookup in (
+        (col1, "venue", "Venue", repo.get_venue),
+        (col2, "comedian", "Comedian", repo.get_comedian)
+    ):
+        df = rollups.totals(start, end, kind).sort_values("revenue", ascending=False)
+        df.insert(0, label, [getattr(lookup(row_id), "name", "") for row_id in df.index])
+        with col:
+            st.markdown(f"**By {label.lower()}**")
+            st.dataframe(df[[label] + list(PERIOD_COLUMNS)], hide_index=True, use_container_width=True, column_config=PERIOD_COLUMNS)
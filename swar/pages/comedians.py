@@ -0,0 +1,170 @@
+"""Comedians: the roster, with search, paging and add/edit/delete."""
+import streamlit as st
+
+from swar.flash import flash
+from swar.jobs import refreshed
+from swar.models import Comedian
+from swar.pages import rerun
+from swar.pagination import DEFAULT_PAGE_SIZES, paginate, view_mode
+from swar.resources import get_job_runner, get_scoreboard, get_search_index
+from swar.storage import FEE_RANGE, RATING_RANGE, NameTaken
+
+# Roster orders; "Draw" is the typed rating moved towards how their shows actually sell
+SORT_KEYS = {
+    "Draw": lambda c, board: -board.rating(c),
+    "Rating": lambda c, board: -c.rating,
+    "Name": lambda c, board: c.name.lower(),
+    "Fee": lambda c, board: c.fee
+}
+
+# Search results fetched beyond the page being viewed, so the next few pages can be reached
+SEARCH_PAGES_AHEAD = 4
+
+
+def clamp(value, bounds):
+    return min(max(value, bounds[0]), bounds[1])
+
+
+def draw_line(performance):
+    if performance is None:
+        return "Draw: no ticket sales yet"
+    shows = "1 show" if performance.shows == 1 else f"{performance.shows} shows"
+    return f"Draw: {performance.draw:.0f}/100 ({performance.occupancy:.0f}% full over {shows})"
+
+
+def render(repo):
+    """Draw the comedian roster."""
+    st.markdown("<h1 class='main-header'>Comedians</h1>", unsafe_allow_html=True)
+
+    # Add new comedian form
+    with st.expander("Add New Comedian"):
+        with st.form("add_comedian"):
+            name = st.text_input("Name")
+            rating = st.slider("Rating", *RATING_RANGE, 4.0, 0.1)
+            fee = st.number_input("Fee ($)", min_value=FEE_RANGE[0], max_value=FEE_RANGE[1], value=5000, step=500)
+            specialty = st.text_input("Specialty")
+
+            submitted = st.form_submit_button("Add Comedian")
+            if submitted and name:
+                try:
+                    repo.add_comedian(
+                        name=name,
+                        rating=rating,
+                        fee=fee,
+                        specialty=specialty
+                    )
+                except NameTaken as error:
+                    st.error(str(error))
+                else:
+                    flash(f"Added {name} to the roster!")
+                    rerun()
+
+    # Display comedians
+    roster(repo)
+
+    # Edit comedian (if edit button was clicked and they still exist)
+    comedian = repo.get_comedian(st.session_state.get("edit_comedian_id"))
+    if comedian is not None:
+        st.markdown("<h2 class='sub-header'>Edit Comedian</h2>", unsafe_allow_html=True)
+
+        with st.form("edit_comedian"):
+            name = st.text_input("Name", value=comedian.name)
+            # Records from before the limits were enforced on import start inside them
+            rating = st.slider("Rating", *RATING_RANGE, clamp(comedian.rating, RATING_RANGE), 0.1)
+            fee = st.number_input(
+                "Fee ($)", min_value=FEE_RANGE[0], max_value=FEE_RANGE[1], value=clamp(comedian.fee, FEE_RANGE), step=500
+            )
+            specialty = st.text_input("Specialty", value=comedian.specialty)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.form_submit_button("Save Changes"):
+                    try:
+                        repo.update_comedian(
+                            comedian.id,
+                            name=name,
+                            rating=rating,
+                            fee=fee,
+                            specialty=specialty
+                        )
+                    except NameTaken as error:
+                        st.error(str(error))
+                    else:
+                        flash(f"Updated {name}'s information!")
+                        del st.session_state.edit_comedian_id
+                        rerun()
+
+            with col2:
+                if st.form_submit_button("Cancel"):
+                    del st.session_state.edit_comedian_id
+                    rerun()
+
+
+def roster(repo):
+    """The roster: search, sort and one page of comedians with their actions."""
+    st.markdown("<h2 class='sub-header'>Comedian Roster</h2>", unsafe_allow_html=True)
+
+    # Sales performance per comedian, updated incrementally after every sale;
+    # a rebuild (after a comedian is removed or an import) runs in the background
+    board = refreshed(get_job_runner(), "comedian scores", get_scoreboard(), repo)
+    if board is None:
+        return
+
+    # Search and filter
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search = st.text_input("Search comedians", placeholder="Name or specialty")
+    with col2:
+        order = st.selectbox("Sort by", list(SORT_KEYS), disabled=bool(search))
+
+    if search:
+        # Ranked prefix, substring and fuzzy matches from the prebuilt index, only as many as can be paged to
+        page_size = st.session_state.get("roster_page_size", DEFAULT_PAGE_SIZES[0])
+        limit = page_size * (st.session_state.get("roster_page", 1) + SEARCH_PAGES_AHEAD)
+        index = refreshed(get_job_runner(), "search index", get_search_index(), repo)
+        if index is None:
+            return
+        matches = index.search(search, limit=limit)
+        filtered_comedians = [c for c in map(repo.get_comedian, matches) if c is not None]
+        if len(matches) == limit:
+            st.caption(f"Showing the best {limit} matches; page on or refine the search for more.")
+    else:
+        filtered_comedians = board.sorted_roster(repo, order, SORT_KEYS[order])
+
+    # Only the current page of the roster is rendered
+    view = view_mode("roster", len(filtered_comedians))
+    start, stop = paginate("roster", len(filtered_comedians))
+    page_comedians = filtered_comedians[start:stop]
+
+    if view == "Table":
+        # pandas is loaded only once the roster is big enough for the table view
+        import pandas as pd
+
+        roster_df = pd.DataFrame(page_comedians, columns=Comedian._fields)
+        roster_df["draw"] = [getattr(board.performance(c.id), "draw", None) for c in page_comedians]
+        st.dataframe(roster_df.set_index("id"), use_container_width=True)
+    else:
+        # Display comedians in a grid
+        cols = st.columns(3)
+        for i, comedian in enumerate(page_comedians):
+            with cols[i % 3]:
+                st.markdown(f"""
+                <div class='card'>
+                    <h3>{comedian.name}</h3>
+                    <p>Rating: {'⭐' * int(comedian.rating)} ({comedian.rating})</p>
+                    <p>Fee: ${comedian.fee:,}</p>
+                    <p>Specialty: {comedian.specialty}</p>
+                    <p>{draw_line(board.performance(comedian.id))}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Actions
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button(f"Edit {comedian.name}", key=f"edit_{comedian.id}"):
+                        st.session_state.edit_comedian_id = comedian.id
+                with col2:
+                    if st.button(f"Delete {comedian.name}", key=f"delete_{comedian.id}"):
+                        repo.delete_comedian(comedian.id)
+                        flash(f"Removed {comedian.name} from the roster!")
+                        rerun()
@@ -0,0 +1,62 @@
+"""Dashboard: headline metrics, upcoming shows and shortcuts to the other pages."""
+import streamlit as st
+
+from swar.pages import change_page
+from swar.resources import get_summary
+
+# How many of the next shows the Dashboard lists
+UPCOMING_SHOWS = 5
+
+
+def render(repo):
+    """Draw the dashboard."""
+    st.markdown("<h1 class='main-header'>Dashboard</h1>", unsafe_allow_html=True)
+
+    # Running totals, patched from the repository change log rather than summed per run
+    summary = get_summary().refresh(repo)
+
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"<div class='metric-card'><h2>{repo.count_comedians()}</h2><p>Comedians</p></div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"<div class='metric-card'><h2>{summary.upcoming_count}</h2><p>Upcoming Shows</p></div>", unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"<div class='metric-card'><h2>{summary.tickets_sold}</h2><p>Tickets Sold</p></div>", unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(f"<div class='metric-card'><h2>{summary.occupancy_rate:.0f}%</h2><p>Occupancy Rate</p></div>", unsafe_allow_html=True)
+
+    # Upcoming shows
+    st.markdown("<h2 class='sub-header'>Upcoming Shows</h2>", unsafe_allow_html=True)
+
+    # Only the next few shows, straight off the summary's heap
+    upcoming = [repo.get_show(show_id) for show_id in summary.upcoming(UPCOMING_SHOWS)]
+    if not upcoming:
+        st.info("No upcoming shows scheduled.")
+    for show in upcoming:
+        venue = repo.get_venue(show.venue_id)
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            st.markdown(f"<div class='card'><h3>{show.title}</h3><p>Date: {show.date.strftime('%B %d, %Y')}</p><p>Venue: {venue.name if venue else ''}</p></div>", unsafe_allow_html=True)
+        with col2:
+            st.markdown(f"<div class='card'><h4>Comedians</h4><p>{', '.join(c.name for c in repo.lineup(show))}</p></div>", unsafe_allow_html=True)
+        with col3:
+            st.markdown(f"<div class='card'><h4>Ticket Sales</h4><p>{show.tickets_sold} / {show.capacity}</p></div>", unsafe_allow_html=True)
+            st.progress(min(show.tickets_sold / show.capacity, 1.0) if show.capacity else 0.0)
+
+    # Quick actions
+    st.markdown("<h2 class='sub-header'>Quick Actions</h2>", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.button("Add New Show", on_click=change_page, args=["Shows"])
+
+    with col2:
+        st.button("Manage Comedians", on_click=change_page, args=["Comedians"])
+
+    with col3:
+        st.button("View Analytics", on_click=change_page, args=["Analytics"])
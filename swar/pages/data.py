@@ -0,0 +1,68 @@
+"""Data: bulk import and export of comedians, venues and shows."""
+import io
+
+import streamlit as st
+
+from swar.bulk import ENTITIES, FORMATS, detect_format, export_file, import_file
+from swar.jobs import follow
+from swar.resources import get_job_runner
+
+
+def render(repo):
+    """Draw the import and export page."""
+    st.markdown("<h1 class='main-header'>Data</h1>", unsafe_allow_html=True)
+
+    # Bulk import
+    st.markdown("<h2 class='sub-header'>Import</h2>", unsafe_allow_html=True)
+    st.caption("Import comedians and venues before the shows that refer to them. "
+               "Shows list their comedians by name, separated by ';'.")
+
+    with st.form("bulk_import"):
+        entity = st.selectbox("Import", ENTITIES, format_func=str.title)
+        upload = st.file_uploader("CSV or Parquet file", type=["csv", "parquet"])
+        update = st.checkbox("Update comedians and venues that already exist")
+
+        if st.form_submit_button("Import") and upload is not None:
+            # The upload is copied so the job can read it after this run ends
+            fmt = detect_format(upload.name)
+            source = io.BytesIO(upload.getvalue())
+            source_size = max(len(source.getbuffer()), 1)
+            job = get_job_runner().submit(f"Importing {upload.name}", lambda job: import_file(
+                repo, entity, source, fmt=fmt, update=update,
+                progress=lambda rows: job.update(source.tell() / source_size, f"{rows:,} rows processed")
+            ))
+            st.session_state.import_job = job.id
+
+    # Report on the import once it has finished (it is forgotten if the runner restarted)
+    job = get_job_runner().get(st.session_state.get("import_job"))
+    if job is None:
+        st.session_state.pop("import_job", None)
+    elif not job.done:
+        follow(job)
+    else:
+        del st.session_state.import_job
+        if job.error:
+            st.error(job.error)
+        else:
+            st.success(job.result.summary())
+            for error in job.result.errors:
+                st.warning(error)
+
+    # Bulk export
+    st.markdown("<h2 class='sub-header'>Export</h2>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        export_entity = st.selectbox("Export", ENTITIES, format_func=str.title)
+    with col2:
+        export_format = st.radio("Format", FORMATS, horizontal=True)
+
+    if st.button("Prepare Export"):
+        buffer = io.BytesIO()
+        export_file(repo, export_entity, buffer, fmt=export_format)
+        st.download_button(
+            f"Download {export_entity}.{export_format}",
+            buffer.getvalue(),
+            file_name=f"{export_entity}.{export_format}",
+            mime="text/csv" if export_format == "csv" else "application/octet-stream"
+        )
@@ -0,0 +1,283 @@
+"""Shows: scheduling, the lineup optimizer and ticket sales."""
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from swar.analytics import PRICE_TIERS
+from swar.flash import flash
+from swar.jobs import follow, refreshed
+from swar.optimizer import optimize
+from swar.pages import rerun
+from swar.pagination import paginate, view_mode
+from swar.resources import get_analytics, get_conflict_detector, get_job_runner, get_scoreboard
+from swar.storage import DEFAULT_DURATION_MINUTES, DEFAULT_HOLD_MINUTES
+
+# Shown when a form needs the booking calendar or scores while they rebuild
+BOOKINGS_PENDING = "Bookings and scores are being rebuilt; try again once the progress bar above is done."
+
+
+def report_conflicts(repo, conflicts, venue_name):
+    """Show an error for each booking that clashes with a new show."""
+    for conflict in conflicts:
+        booked = repo.get_show(conflict.show_id)
+        who = venue_name if conflict.kind == "venue" else repo.get_comedian(conflict.resource_id).name
+        st.error(f"{who} is already booked for '{booked.title}' "
+                 f"({conflict.start.strftime('%b %d, %I:%M %p')} – {conflict.end.strftime('%I:%M %p')})")
+
+
+def render(repo):
+    """Draw the shows page."""
+    st.markdown("<h1 class='main-header'>Shows</h1>", unsafe_allow_html=True)
+
+    # Scores and bookings are patched after each change; when they have to be
+    # rebuilt that runs in the background, and what needs them waits for it
+    runner = get_job_runner()
+    board = refreshed(runner, "comedian scores", get_scoreboard(), repo)
+    detector = refreshed(runner, "booking calendar", get_conflict_detector(), repo)
+
+    # Add new show form
+    with st.expander("Schedule New Show"):
+        with st.form("add_show"):
+            title = st.text_input("Show Title")
+            date = st.date_input("Date", value=datetime.now() + timedelta(days=7))
+            show_time = st.time_input("Time", value=datetime.now().replace(hour=20, minute=0))
+            venues = repo.list_venues()
+            venue = st.selectbox("Venue", [v.name for v in venues])
+
+            # Get capacity based on selected venue
+            selected_venue = next((v for v in venues if v.name == venue), None)
+            capacity = selected_venue.capacity if selected_venue else 0
+
+            # Strongest draw first, from their shows' ticket sales (typed rating while the scores rebuild)
+            roster = repo.list_comedians()
+            rated = board.rated(roster) if board is not None else sorted(roster, key=lambda c: -c.rating)
+            comedian_ids = {c.name: c.id for c in rated}
+            comedians = st.multiselect("Select Comedians", list(comedian_ids))
+
+            tier = st.selectbox("Ticket Tier", list(PRICE_TIERS), format_func=lambda t: f"{t} (${PRICE_TIERS[t]})")
+            duration = st.number_input("Duration (minutes)", min_value=30, max_value=360, value=DEFAULT_DURATION_MINUTES, step=15)
+
+            submitted = st.form_submit_button("Schedule Show")
+            if submitted and title and venue and comedians and detector is None:
+                st.warning(BOOKINGS_PENDING)
+            elif submitted and title and venue and comedians:
+                # Combine date and time
+                show_datetime = datetime.combine(date, show_time)
+                lineup_ids = [comedian_ids[name] for name in comedians]
+
+                # Refuse double bookings of the venue or any comedian
+                conflicts = detector.find_conflicts(show_datetime, duration, selected_venue.id, lineup_ids)
+                if conflicts:
+                    report_conflicts(repo, conflicts, venue)
+                    slots = detector.suggest_slots(show_datetime, duration, selected_venue.id, lineup_ids)
+                    if slots:
+                        st.info("Nearest free slots: " + ", ".join(slot.strftime('%b %d, %I:%M %p') for slot in slots))
+                else:
+                    repo.add_show(
+                        title=title,
+                        date=show_datetime,
+                        venue_id=selected_venue.id,
+                        capacity=capacity,
+                        comedian_ids=lineup_ids,
+                        ticket_price=PRICE_TIERS[tier],
+                        duration_minutes=duration
+                    )
+                    flash(f"Scheduled '{title}' at {venue}!")
+                    rerun()
+
+    # Let the optimizer propose a venue and lineup
+    with st.expander("Lineup Optimizer"):
+        with st.form("optimize_lineup"):
+            opt_title = st.text_input("Show Title", value="Comedy Night")
+            date_range = st.date_input("Date Range", value=(datetime.now().date(), (datetime.now() + timedelta(days=30)).date()))
+            opt_time = st.time_input("Time", value=datetime.now().replace(hour=20, minute=0))
+            budget = st.number_input("Budget ($)", min_value=500, max_value=500000, value=30000, step=500)
+            audience = st.number_input("Target Audience", min_value=10, max_value=10000, value=250, step=10)
+            opt_tier = st.selectbox("Ticket Tier", list(PRICE_TIERS), format_func=lambda t: f"{t} (${PRICE_TIERS[t]})", key="opt_tier")
+            lineup_size = st.slider("Lineup Size", 1, 5, (2, 3))
+
+            search = st.form_submit_button("Find Best Lineups")
+            if search and (board is None or detector is None):
+                st.warning(BOOKINGS_PENDING)
+            elif search:
+                start_date, end_date = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+                # Inputs are read here; the search itself runs as a background job
+                comedians = board.rated(repo.list_comedians())
+                venues = repo.list_venues()
+                ticket_price = PRICE_TIERS[opt_tier]
+                job = runner.submit("Lineup optimizer", lambda job: {
+                    "title": opt_title,
+                    "ticket_price": ticket_price,
+                    "proposals": optimize(
+                        # Ratings adjusted for how each comedian's shows have sold
+                        comedians,
+                        venues,
+                        start_date,
+                        end_date,
+                        budget=budget,
+                        audience=audience,
+                        ticket_price=ticket_price,
+                        show_time=opt_time,
+                        duration_minutes=DEFAULT_DURATION_MINUTES,
+                        detector=detector,
+                        min_size=lineup_size[0],
+                        max_size=lineup_size[1],
+                        progress=lambda share: job.update(share, f"{share:.0%} of dates searched")
+                    )
+                })
+                st.session_state.lineup_job = job.id
+                st.session_state.pop("lineup_proposals", None)
+
+        # Collect the search once it has finished (it is forgotten if the runner restarted)
+        job = runner.get(st.session_state.get("lineup_job"))
+        if job is None:
+            st.session_state.pop("lineup_job", None)
+        elif not job.done:
+            follow(job)
+        else:
+            del st.session_state.lineup_job
+            if job.error:
+                st.error(f"The lineup search failed: {job.error}")
+            else:
+                st.session_state.lineup_proposals = job.result
+
+        if 'lineup_proposals' in st.session_state:
+            request = st.session_state.lineup_proposals
+            if not request["proposals"]:
+                st.info("No lineup fits the budget in that date range.")
+            for k, proposal in enumerate(request["proposals"]):
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.markdown(f"""
+                    <div class='card'>
+                        <h4>{proposal.date.strftime('%B %d, %Y at %I:%M %p')} · {proposal.venue.name}</h4>
+                        <p>Comedians: {', '.join(c.name for c in proposal.comedians)}</p>
+                        <p>Expected audience: {proposal.expected_attendance} · Revenue: ${proposal.revenue:,.0f} · Cost: ${proposal.cost:,.0f} · Profit: ${proposal.profit:,.0f}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                with col2:
+                    schedule = st.button("Schedule", key=f"schedule_proposal_{k}")
+                if schedule and detector is None:
+                    st.warning(BOOKINGS_PENDING)
+                elif schedule:
+                    # The slot may have been booked since the search ran
+                    lineup_ids = [c.id for c in proposal.comedians]
+                    conflicts = detector.find_conflicts(proposal.date, DEFAULT_DURATION_MINUTES, proposal.venue.id, lineup_ids)
+                    if conflicts:
+                        report_conflicts(repo, conflicts, proposal.venue.name)
+                        st.info("Run the optimizer again for lineups that are still free.")
+                    else:
+                        repo.add_show(
+                            title=request["title"],
+                            date=proposal.date,
+                            venue_id=proposal.venue.id,
+                            capacity=proposal.venue.capacity,
+                            comedian_ids=lineup_ids,
+                            ticket_price=request["ticket_price"]
+                        )
+                        del st.session_state.lineup_proposals
+                        flash(f"Scheduled '{request['title']}' at {proposal.venue.name}!")
+                        rerun()
+
+    # Display shows
+    st.markdown("<h2 class='sub-header'>Upcoming Shows</h2>", unsafe_allow_html=True)
+
+    # Sorted by date, with occupancy and remaining seats precomputed for all shows;
+    # a full build runs in the background, as on the Analytics page
+    analytics = refreshed(runner, "show analytics", get_analytics(), repo)
+    if analytics is None:
+        return
+    sorted_shows = analytics.upcoming()
+
+    # Seats on hold by any session are not for sale
+    held_tickets = repo.held_tickets()
+
+    # Only the current page of shows is rendered
+    view = view_mode("shows", len(sorted_shows))
+    start, stop = paginate("shows", len(sorted_shows), page_sizes=(10, 25, 50, 100))
+    page_shows = sorted_shows.iloc[start:stop]
+
+    if view == "Table":
+        st.dataframe(
+            page_shows[["title", "date", "venue", "lineup", "tickets_sold", "capacity", "occupancy_rate", "ticket_price"]],
+            use_container_width=True,
+            column_config={
+                "occupancy_rate": st.column_config.ProgressColumn("Occupancy", format="%.0f%%", min_value=0, max_value=100),
+                "ticket_price": st.column_config.NumberColumn("Price", format="$%.0f")
+            }
+        )
+    else:
+        for show in page_shows.itertuples():
+            col1, col2 = st.columns([3, 1])
+
+            with col1:
+                st.markdown(f"""
+                <div class='card'>
+                    <h3>{show.title}</h3>
+                    <p>Date: {show.date.strftime('%B %d, %Y at %I:%M %p')}</p>
+                    <p>Venue: {show.venue} (Capacity: {show.capacity})</p>
+                    <p>Comedians: {show.lineup}</p>
+                    <p>Tickets: ${show.ticket_price:,.0f}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+            with col2:
+                st.markdown(f"""
+                <div class='card'>
+                    <h4>Ticket Sales</h4>
+                    <p>{show.tickets_sold} / {show.capacity}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Progress bar for ticket sales
+                st.progress(min(int(show.occupancy_rate), 100) / 100)
+
+                held = held_tickets.get(show.Index, 0)
+                st.caption(f"{max(show.remaining - held, 0)} available" + (f", {held} on hold" if held else ""))
+
+                # Actions: the repository checks capacity atomically, so concurrent sales cannot oversell
+                quantity = st.number_input("Tickets", min_value=1, value=1, step=1, key=f"quantity_{show.Index}")
+                if st.button(f"Sell Tickets", key=f"sell_{show.Index}"):
+                    try:
+                        repo.sell_tickets(show.Index, quantity)
+                    except ValueError as error:
+                        # Sold out, or cancelled by another session
+                        flash(str(error), icon="⚠️")
+                    else:
+                        flash(f"Sold {quantity} more tickets!")
+                    rerun()
+
+                # Only a live hold on this very show is ours to confirm or release
+                hold = repo.get_hold(st.session_state.ticket_holds.get(show.Index))
+                if hold is None or hold["show_id"] != show.Index:
+                    hold = None
+                    st.session_state.ticket_holds.pop(show.Index, None)
+                    if st.button(f"Hold Tickets", key=f"hold_{show.Index}"):
+                        try:
+                            st.session_state.ticket_holds[show.Index] = repo.hold_tickets(show.Index, quantity)
+                        except ValueError as error:
+                            flash(str(error), icon="⚠️")
+                        else:
+                            flash(f"Holding {quantity} tickets for {DEFAULT_HOLD_MINUTES} minutes", icon="⏳")
+                        rerun()
+                else:
+                    st.caption(f"Holding {hold['quantity']} until {hold['expires_at'].strftime('%I:%M %p')}")
+                    if st.button(f"Confirm Hold", key=f"confirm_{show.Index}"):
+                        try:
+                            repo.confirm_hold(hold["id"])
+                        except ValueError as error:
+                            flash(str(error), icon="⚠️")
+                        else:
+                            flash(f"Sold {hold['quantity']} held tickets!")
+                        del st.session_state.ticket_holds[show.Index]
+                        rerun()
+                    if st.button(f"Release Hold", key=f"release_{show.Index}"):
+                        repo.release_hold(hold["id"])
+                        del st.session_state.ticket_holds[show.Index]
+                        flash(f"Released {hold['quantity']} held tickets", icon="↩️")
+                        rerun()
+
+                if st.button(f"Cancel Show", key=f"cancel_{show.Index}"):
+                    repo.delete_show(show.Index)
+                    flash(f"Cancelled '{show.title}'")
+                    rerun()
@@ -0,0 +1,62 @@
+"""Venues: the venue list and a cost comparison chart."""
+import pandas as pd
+import streamlit as st
+
+from swar.charts import venue_figure
+from swar.flash import flash
+from swar.models import Venue
+from swar.pages import rerun
+from swar.resources import get_figure_cache
+from swar.storage import CAPACITY_RANGE, RENTAL_FEE_RANGE, NameTaken
+
+
+def render(repo):
+    """Draw the venues page."""
+    st.markdown("<h1 class='main-header'>Venues</h1>", unsafe_allow_html=True)
+
+    # Add new venue form
+    with st.expander("Add New Venue"):
+        with st.form("add_venue"):
+            name = st.text_input("Venue Name")
+            capacity = st.number_input("Capacity", min_value=CAPACITY_RANGE[0], max_value=CAPACITY_RANGE[1], value=200, step=10)
+            rental_fee = st.number_input(
+                "Rental Fee ($)", min_value=RENTAL_FEE_RANGE[0], max_value=RENTAL_FEE_RANGE[1], value=2000, step=100
+            )
+
+            submitted = st.form_submit_button("Add Venue")
+            if submitted and name:
+                try:
+                    repo.add_venue(
+                        name=name,
+                        capacity=capacity,
+                        rental_fee=rental_fee
+                    )
+                except NameTaken as error:
+                    st.error(str(error))
+                else:
+                    flash(f"Added {name} to venues!")
+                    rerun()
+
+    # Display venues
+    st.markdown("<h2 class='sub-header'>Available Venues</h2>", unsafe_allow_html=True)
+
+    # Create a DataFrame for better display
+    venues_df = pd.DataFrame(repo.list_venues(), columns=Venue._fields).drop(columns="id")
+
+    # Add a column for cost per seat
+    venues_df["Cost per Seat"] = venues_df["rental_fee"] / venues_df["capacity"]
+
+    # Format the DataFrame
+    venues_df.columns = ["Name", "Capacity", "Rental Fee ($)", "Cost per Seat ($)"]
+    venues_df["Rental Fee ($)"] = venues_df["Rental Fee ($)"].apply(lambda x: f"${x:,.2f}")
+    venues_df["Cost per Seat ($)"] = venues_df["Cost per Seat ($)"].apply(lambda x: f"${x:.2f}")
+
+    # Display as a table
+    st.dataframe(venues_df, use_container_width=True)
+
+    # Venue comparison chart
+    st.markdown("<h2 class='sub-header'>Venue Comparison</h2>", unsafe_allow_html=True)
+
+    # Rebuilt only when a venue changes, not on every ticket sale
+    fig = get_figure_cache().get("venues", repo.table_version("venues"), lambda: venue_figure(repo.list_venues()))
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,49 @@
+"""Server-side pagination for long lists.
+
+Pages only emit widgets for the visible slice, so the number of elements per
+rerun stays bounded by the page size however large the roster grows.
+"""
+import math
+import os
+
+import streamlit as st
+
+DEFAULT_PAGE_SIZES = (12, 24, 48, 96)
+
+# Above this many items the compact table view is selected by default
+TABLE_VIEW_THRESHOLD = int(os.environ.get("SWAR_TABLE_VIEW_THRESHOLD", 200))
+
+
+def view_mode(key, total, options=("Cards", "Table"), threshold=TABLE_VIEW_THRESHOLD):
+    """Let the user pick between a detailed and a compact rendering, compact by default past ``threshold``."""
+    return st.radio(
+        "View",
+        list(options),
+        index=1 if total > threshold else 0,
+        horizontal=True,
+        key=f"{key}_view"
+    )
+
+
+def paginate(key, total, page_sizes=DEFAULT_PAGE_SIZES):
+    """Render page controls and return the ``(start, stop)`` slice to display."""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Per page", page_sizes, key=f"{key}_page_size")
+
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    # Keep the stored page in range after deletes or a smaller page count
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    with col3:
+        if total:
+            st.caption(f"Showing {start + 1}–{stop} of {total}")
+        else:
+            st.caption("Nothing to show")
+    return start, stop
@@ -0,0 +1,87 @@
+"""Objects built once per process and shared by every session.
+
+Each getter is an ``st.cache_resource`` singleton that imports what it
+builds on first call, so a page pays for the modules it uses and nothing
+else: the analytics cache brings in pandas, the forecaster numpy, the
+figure cache plotly.
+"""
+import os
+
+import streamlit as st
+
+from swar.storage import DEFAULT_DB_PATH, Repository
+
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css")
+
+
+@st.cache_resource
+def get_repository():
+    """The shared repository; the database is opened (and seeded) once per process."""
+    return Repository(DEFAULT_DB_PATH)
+
+
+@st.cache_resource
+def get_style():
+    """The app's stylesheet as a ``<style>`` block, read from disk once."""
+    with open(STYLE_PATH) as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+@st.cache_resource
+def get_analytics():
+    from swar.analytics import AnalyticsCache
+    return AnalyticsCache()
+
+
+@st.cache_resource
+def get_rollups():
+    from swar.rollups import Rollups
+    return Rollups()
+
+
+@st.cache_resource
+def get_scoreboard():
+    from swar.scoring import ScoreBoard
+    return ScoreBoard()
+
+
+@st.cache_resource
+def get_summary():
+    from swar.summary import DashboardSummary
+    return DashboardSummary()
+
+
+@st.cache_resource
+def get_search_index():
+    from swar.search import SearchIndex
+    return SearchIndex()
+
+
+@st.cache_resource
+def get_conflict_detector():
+    from swar.conflicts import ConflictDetector
+    return ConflictDetector()
+
+
+@st.cache_resource
+def get_forecaster():
+    from swar.forecast import RevenueForecaster
+    return RevenueForecaster()
+
+
+@st.cache_resource
+def get_figure_cache():
+    from swar.charts import FigureCache
+    return FigureCache()
+
+
+@st.cache_resource
+def get_job_runner():
+    from swar.jobs import JobRunner
+    return JobRunner()
+
+
+@st.cache_resource
+def get_latency_tracker():
+    from swar.latency import LatencyTracker
+    return LatencyTracker()
@@ -0,0 +1,149 @@
+"""Tickets, revenue and occupancy per day, week and month, for every venue and comedian.
+
+Shows are partitioned by the day they take place on. Each show is filed
+under its day, its week (starting Monday) and its month, once for every
+series it belongs to: all shows, its venue, and each comedian in its lineup
+(the keys of :func:`swar.forecast.series_keys`). A bucket holds tickets
+sold, revenue, seats offered and the number of shows. When a show changes,
+its old contribution is taken out of its buckets and the new one put in,
+so the rollups stay current without rescanning the catalogue.
+
+A date-range query adds up whole months where it can and single days at
+the ragged ends, so "Q3 revenue by venue" reads three month buckets per
+venue, not every show of the quarter.
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+from swar.forecast import TOTAL, series_keys
+from swar.incremental import IncrementalCache
+
+FREQUENCIES = ("day", "week", "month")
+
+MEASURES = ["tickets", "revenue", "capacity", "shows"]
+
+
+def period_start(day, freq):
+    """The first day of the ``freq`` period containing ``day``."""
+    if freq == "week":
+        return day - timedelta(days=day.weekday())
+    if freq == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(start, freq):
+    """The first day after the ``freq`` period beginning on ``start``."""
+    if freq == "week":
+        return start + timedelta(days=7)
+    if freq == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def add_occupancy(df):
+    """Return ``df`` with tickets sold as a percentage of seats offered (0 where there were none)."""
+    capacity = df["capacity"].where(df["capacity"] > 0)
+    return df.assign(occupancy_rate=(df["tickets"] / capacity * 100).fillna(0.0))
+
+
+class Rollups(IncrementalCache):
+    """Day, week and month buckets per series, kept in sync with a Repository."""
+
+    REBUILD_ON = {("comedians", "delete")}
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    # Queries
+
+    def span(self):
+        """The first and last day with a show, or None when there are no shows."""
+        with self._lock:
+            days = self._buckets["day"]
+            return (min(days), max(days)) if days else None
+
+    def totals(self, start, end, kind="total"):
+        """Measures per series of ``kind`` ("total", "venue" or "comedian") over days ``start`` to ``end``.
+
+        Returns a DataFrame indexed by venue or comedian id (None for the
+        total) with the :data:`MEASURES` and ``occupancy_rate``.
+        """
+        with self._lock:
+            sums = {}
+            for freq, period in self._cover(start, end + timedelta(days=1)):
+                for key, values in self._buckets[freq].get(period, {}).items():
+                    if key[0] == kind:
+                        total = sums.setdefault(key[1], [0, 0.0, 0, 0])
+                        for i, value in enumerate(values):
+                            total[i] += value
+        df = pd.DataFrame.from_dict(sums, orient="index", columns=MEASURES)
+        df.index.name = "id"
+        return add_occupancy(df)
+
+    def timeline(self, start, end, freq, key=TOTAL):
+        """Measures for ``key`` in every ``freq`` period from ``start`` to ``end``, clipped to the range."""
+        stop = end + timedelta(days=1)
+        rows = []
+        with self._lock:
+            period = period_start(start, freq)
+            while period < stop:
+                following = period_end(period, freq)
+                if period >= start and following <= stop:
+                    pieces = [(freq, period)]
+                else:
+                    pieces = self._cover(max(period, start), min(following, stop))
+                total = [0, 0.0, 0, 0]
+                for piece_freq, piece in pieces:
+                    for i, value in enumerate(self._buckets[piece_freq].get(piece, {}).get(key, ())):
+                        total[i] += value
+                rows.append([period] + total)
+                period = following
+        return add_occupancy(pd.DataFrame(rows, columns=["period"] + MEASURES))
+
+    def _cover(self, start, stop):
+        """``(freq, period)`` buckets that exactly cover days ``start`` up to (not including) ``stop``."""
+        pieces = []
+        day = start
+        while day < stop:
+            if day.day == 1 and period_end(day, "month") <= stop:
+                pieces.append(("month", day))
+                day = period_end(day, "month")
+            else:
+                pieces.append(("day", day))
+                day += timedelta(days=1)
+        return pieces
+
+    # Maintenance
+
+    def _reset(self):
+        self._buckets = {freq: {} for freq in FREQUENCIES}
+        self._shows = {}
+
+    def _set(self, show_id, show):
+        old = self._shows.pop(show_id, None)
+        if old is not None:
+            self._add(*old, sign=-1)
+        if show is None:
+            return
+        contribution = (
+            show.date.date(), tuple(series_keys(show)),
+            (show.tickets_sold, show.tickets_sold * show.ticket_price, show.capacity, 1)
+        )
+        self._shows[show_id] = contribution
+        self._add(*contribution)
+
+    def _add(self, day, keys, values, sign=1):
+        for freq in FREQUENCIES:
+            period = period_start(day, freq)
+            buckets = self._buckets[freq].setdefault(period, {})
+            for key in keys:
+                bucket = buckets.setdefault(key, [0, 0.0, 0, 0])
+                for i, value in enumerate(values):
+                    bucket[i] += sign * value
+                if not bucket[3]:
+                    del buckets[key]
+            if not buckets:
+                del self._buckets[freq][period]
@@ -0,0 +1,149 @@
+"""How well each comedian sells, from the ticket sales of the shows they play.
+
+A comedian's draw (0-100) blends two things their shows have realised:
+
+* occupancy: tickets sold as a share of capacity, averaged over their shows
+  that have sold at least one ticket;
+* sell-through velocity: the share of the house sold per week between a
+  show's first and last sale. A show that would sell out within
+  :data:`SELL_OUT_WEEKS` scores full marks. Shows whose tickets were all
+  logged at once (imported or backfilled history) say nothing about speed
+  and are left out of this half.
+
+Every show contributes its occupancy and velocity to each comedian in its
+lineup, and the board keeps running sums per comedian. A sale or an edit
+swaps one show's old contribution for the new one, so scores stay current
+without re-reading years of sales. The board is built in one pass over the
+shows plus a single aggregate query over the sales log.
+
+The typed-in rating still counts while a comedian has little history:
+:meth:`ScoreBoard.rating` moves from it towards the sales-based draw as
+their shows add up. The roster sort, the lineup picker and the optimizer
+all use that rating; sorted rosters are kept until the next change.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from swar.incremental import IncrementalCache
+
+# Weight of occupancy versus velocity in a comedian's draw
+OCCUPANCY_WEIGHT = 0.7
+
+# Selling out within this many weeks of going on sale is full marks for velocity
+SELL_OUT_WEEKS = 4
+
+# Shortest selling window assumed, so a single burst of sales is not read as instant
+MIN_WINDOW = timedelta(weeks=1)
+
+# Shows of history at which sales and the typed rating weigh the same
+PRIOR_SHOWS = 3
+
+Performance = namedtuple("Performance", ["shows", "occupancy", "velocity", "draw"])
+
+
+def show_performance(show, first_sold, last_sold):
+    """``(occupancy, velocity)`` of a show in 0-1, velocity None when its sales window is unknown."""
+    occupancy = min(show.tickets_sold / show.capacity, 1.0) if show.capacity else 0.0
+    if last_sold <= first_sold:
+        return occupancy, None
+    weeks = max(last_sold - first_sold, MIN_WINDOW) / timedelta(weeks=1)
+    return occupancy, min(occupancy / weeks * SELL_OUT_WEEKS, 1.0)
+
+
+class ScoreBoard(IncrementalCache):
+    """Per-comedian sales performance, kept in sync with a Repository."""
+
+    TABLES = ("shows", "sales")
+    REBUILD_ON = {("comedians", "delete")}
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    # Queries
+
+    def performance(self, comedian_id):
+        """The comedian's :class:`Performance`, or None before any of their shows has sold."""
+        with self._lock:
+            totals = self._totals.get(comedian_id)
+        if not totals or not totals[0]:
+            return None
+        shows, occupancy, timed, velocity = totals
+        occupancy /= shows
+        velocity = velocity / timed if timed else None
+        draw = occupancy if velocity is None else OCCUPANCY_WEIGHT * occupancy + (1 - OCCUPANCY_WEIGHT) * velocity
+        return Performance(shows, occupancy * 100, None if velocity is None else velocity * 100, draw * 100)
+
+    def rating(self, comedian):
+        """``comedian.rating`` moved towards their sales draw (on the same 1-5 scale) as their history grows."""
+        performance = self.performance(comedian.id)
+        if performance is None:
+            return comedian.rating
+        weight = performance.shows / (performance.shows + PRIOR_SHOWS)
+        earned = min(max(performance.draw / 20, 1.0), 5.0)
+        return round(weight * earned + (1 - weight) * comedian.rating, 2)
+
+    def rated(self, comedians):
+        """``comedians`` with :meth:`rating` in place of their typed rating, best first."""
+        return sorted((c._replace(rating=self.rating(c)) for c in comedians), key=lambda c: -c.rating)
+
+    def sorted_roster(self, repo, order, key):
+        """All comedians sorted by ``key(comedian, board)``, cached under ``order`` until the board or roster changes."""
+        with self._lock:
+            version = (self.version, repo.table_version("comedians"))
+            if self._orders_version != version:
+                self._orders, self._orders_version = {}, version
+            if order not in self._orders:
+                self._orders[order] = sorted(repo.list_comedians(), key=lambda c: key(c, self))
+            return self._orders[order]
+
+    # Maintenance
+
+    def _apply(self, repo, changes):
+        show_ids = {row_id for _, table, _, row_id in changes if table == "shows"}
+        if any(table == "sales" for _, table, _, _ in changes):
+            show_ids.update(self._add_sales(repo.sales_by_show(self._last_sale)))
+        for show_id in show_ids:
+            self._set(show_id, repo.get_show(show_id))
+
+    def _rebuild(self, repo):
+        self._reset()
+        self._add_sales(repo.sales_by_show())
+        for show in repo.list_shows():
+            self._set(show.id, show)
+
+    def _reset(self):
+        self._sales, self._last_sale = {}, 0
+        self._shows, self._totals = {}, {}
+        self._orders, self._orders_version = {}, None
+
+    def _add_sales(self, sales):
+        """Merge per-show sale times from :meth:`Repository.sales_by_show`; returns the shows affected."""
+        for show_id, (first, last, last_id) in sales.items():
+            known = self._sales.get(show_id)
+            self._sales[show_id] = (min(first, known[0]), max(last, known[1])) if known else (first, last)
+            self._last_sale = max(self._last_sale, last_id)
+        return sales.keys()
+
+    def _set(self, show_id, show):
+        old = self._shows.pop(show_id, None)
+        if old is not None:
+            self._add(*old, sign=-1)
+        if show is None:
+            self._sales.pop(show_id, None)
+            return
+        sales = self._sales.get(show_id)
+        if sales is None or not show.tickets_sold:
+            return
+        contribution = (show.comedian_ids, *show_performance(show, *sales))
+        self._shows[show_id] = contribution
+        self._add(*contribution)
+
+    def _add(self, comedian_ids, occupancy, velocity, sign=1):
+        for comedian_id in comedian_ids:
+            totals = self._totals.setdefault(comedian_id, [0, 0.0, 0, 0.0])
+            totals[0] += sign
+            totals[1] += sign * occupancy
+            if velocity is not None:
+                totals[2] += sign
+                totals[3] += sign * velocity
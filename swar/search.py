@@ -0,0 +1,306 @@
+"""Incremental search index over comedian names and specialties.
+
+Names are indexed per comedian:
+
+* a sorted list of ``(name, id)``, searched with ``bisect`` for names that
+  start with the query and walked to list matches in name order,
+* a sorted list of ``(word, id)`` for prefix matches on any word of a name,
+* a trigram inverted index, intersected for substring matches and
+  overlap-counted for fuzzy (typo-tolerant) matches.
+
+Specialties repeat across a roster, so the same three structures index each
+distinct specialty once, and a map from specialty to comedian ids expands a
+match to everyone listing it.
+
+Matches are collected one kind at a time, best kind first and each in name
+order, so a search with a ``limit`` stops as soon as it has enough and a
+common word costs about as much as a rare one. Everything is updated per
+comedian as the repository change log reports inserts, edits and deletes,
+so the roster search never scans the full list.
+"""
+import re
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+
+from swar.incremental import IncrementalCache
+
+# Minimum trigram similarity for a fuzzy match, and shortest query to try one for
+FUZZY_THRESHOLD = 0.3
+FUZZY_MIN_LENGTH = 4
+
+# Fuzzy candidates scored per query, those sharing the most trigrams with it first
+FUZZY_CANDIDATES = 200
+
+# Distinct queries remembered between data changes
+RESULT_CACHE_SIZE = 256
+
+# Scores used to rank the different kinds of match
+EXACT, NAME_PREFIX, NAME_WORD_PREFIX, NAME_SUBSTRING, SPECIALTY_MATCH, FUZZY = 100, 80, 60, 50, 30, 20
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    return " ".join(_WORD.findall(text.lower()))
+
+
+@lru_cache(maxsize=65536)
+def _padded_trigrams(text):
+    # Memoised: the same words and specialties recur across a large roster
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(text):
+    """Trigrams of the whole text plus those of each word padded on its own."""
+    grams = set(_padded_trigrams(text))
+    for word in text.split()[1:]:
+        grams |= _padded_trigrams(word)
+    return grams
+
+
+def _similarity(query_grams, text):
+    """Best trigram similarity of the query to ``text`` as a whole or to one of its words."""
+    return max(
+        len(query_grams & grams) / len(query_grams | grams)
+        for grams in map(_padded_trigrams, {text, *text.split()})
+    )
+
+
+class _TextIndex:
+    """Prefix, substring and fuzzy lookup of keys (comedian ids, or specialties) by a text."""
+
+    def __init__(self):
+        self.words = []
+        self.grams = {}
+
+    def add(self, key, text, bulk=False):
+        for word in set(text.split()):
+            if bulk:
+                self.words.append((word, key))
+            else:
+                insort(self.words, (word, key))
+        for gram in trigrams(text):
+            self.grams.setdefault(gram, set()).add(key)
+
+    def remove(self, key, text):
+        for word in set(text.split()):
+            index = bisect_left(self.words, (word, key))
+            if index < len(self.words) and self.words[index] == (word, key):
+                del self.words[index]
+        for gram in trigrams(text):
+            postings = self.grams.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self.grams[gram]
+
+    def with_prefix(self, prefix):
+        """Keys with a word starting with ``prefix``."""
+        keys = set()
+        index = bisect_left(self.words, (prefix,))
+        while index < len(self.words) and self.words[index][0].startswith(prefix):
+            keys.add(self.words[index][1])
+            index += 1
+        return keys
+
+    def containing(self, query):
+        """Keys whose text may contain ``query``: those with all of its inner trigrams."""
+        postings = sorted(
+            (self.grams.get(gram, set()) for gram in trigrams(query) if gram.strip() == gram),
+            key=len
+        )
+        if not postings:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def similar(self, query_grams, text_of):
+        """``(key, similarity)`` for keys whose text is close to the query's trigrams."""
+        overlap = Counter()
+        # "  x" grams only say which letter a word starts with; too common to count
+        counted = [gram for gram in query_grams if not gram.startswith("  ")]
+        for gram in counted:
+            overlap.update(self.grams.get(gram, ()))
+        # Cheap bound before computing exact similarities, for the best-overlapping candidates only
+        min_shared = FUZZY_THRESHOLD * len(query_grams) - (len(query_grams) - len(counted))
+        for key, shared in overlap.most_common(FUZZY_CANDIDATES):
+            if shared < min_shared:
+                break
+            similarity = _similarity(query_grams, text_of(key))
+            if similarity >= FUZZY_THRESHOLD:
+                yield key, similarity
+
+
+class SearchIndex(IncrementalCache):
+    """Prefix, substring and fuzzy lookup of comedians by name and specialty."""
+
+    TABLES = ("comedians",)
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Maintenance
+
+    def add(self, comedian_id, name, specialty="", _bulk=False):
+        with self._lock:
+            self._results.clear()
+            if comedian_id in self._docs:
+                self.remove(comedian_id)
+            name, specialty = normalize(name), normalize(specialty or "")
+            self._docs[comedian_id] = (name, specialty)
+            if _bulk:
+                self._names.append((name, comedian_id))
+            else:
+                insort(self._names, (name, comedian_id))
+            self._name_index.add(comedian_id, name, _bulk)
+            if specialty not in self._specialties:
+                self._specialties[specialty] = set()
+                self._specialty_index.add(specialty, specialty, _bulk)
+            self._specialties[specialty].add(comedian_id)
+
+    def remove(self, comedian_id):
+        with self._lock:
+            self._results.clear()
+            doc = self._docs.pop(comedian_id, None)
+            if doc is None:
+                return
+            name, specialty = doc
+            index = bisect_left(self._names, (name, comedian_id))
+            if index < len(self._names) and self._names[index] == (name, comedian_id):
+                del self._names[index]
+            self._name_index.remove(comedian_id, name)
+            members = self._specialties[specialty]
+            members.discard(comedian_id)
+            if not members:
+                del self._specialties[specialty]
+                self._specialty_index.remove(specialty, specialty)
+
+    def _apply(self, repo, changes):
+        for comedian_id in dict.fromkeys(row_id for _, table, _, row_id in changes if table == "comedians"):
+            comedian = repo.get_comedian(comedian_id)
+            if comedian is None:
+                self.remove(comedian_id)
+            else:
+                self.add(comedian_id, comedian.name, comedian.specialty)
+
+    def _rebuild(self, repo):
+        self._reset()
+        for comedian in repo.list_comedians():
+            self.add(comedian.id, comedian.name, comedian.specialty, _bulk=True)
+        self._names.sort()
+        self._name_index.words.sort()
+        self._specialty_index.words.sort()
+
+    def _reset(self):
+        self._docs, self._names, self._specialties, self._results = {}, [], {}, {}
+        self._name_index, self._specialty_index = _TextIndex(), _TextIndex()
+
+    # Queries
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Comedian ids matching ``query``, best match first.
+
+        Matches on a word prefix, a substring of the name or specialty, and -
+        when ``fuzzy`` is set and fewer than ``limit`` other matches turned
+        up - on trigram similarity, so "chapelle" still finds "Dave
+        Chappelle".
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        with self._lock:
+            key = (query, limit, fuzzy)
+            if key not in self._results:
+                if len(self._results) >= RESULT_CACHE_SIZE:
+                    self._results.clear()
+                self._results[key] = self._search(query, limit, fuzzy)
+            return self._results[key]
+
+    def _search(self, query, limit, fuzzy):
+        words = query.split()
+        found = {}
+
+        def take(comedian_ids, score):
+            """Add the unseen ``comedian_ids`` in name order; True once ``limit`` matches are in."""
+            need = None if limit is None else limit - len(found)
+            for comedian_id in self._by_name(comedian_ids, found, need):
+                found[comedian_id] = score
+            return limit is not None and len(found) >= limit
+
+        def whole(comedian_ids):
+            # Multi-word queries must match as a whole, not just on the last word
+            if len(words) == 1:
+                return comedian_ids
+            return {
+                comedian_id for comedian_id in comedian_ids
+                if all(word in " ".join(self._docs[comedian_id]) for word in words)
+            }
+
+        # Names starting with the query, already in name order (an exact match sorts first)
+        index = bisect_left(self._names, (query,))
+        while index < len(self._names) and self._names[index][0].startswith(query):
+            name, comedian_id = self._names[index]
+            found[comedian_id] = EXACT if name == query else NAME_PREFIX
+            if len(found) == limit:
+                return list(found)
+            index += 1
+
+        if take(whole(self._name_index.with_prefix(words[-1])), NAME_WORD_PREFIX):
+            return list(found)
+        if len(query) >= 3:
+            inside = {i for i in self._name_index.containing(query) if query in self._docs[i][0]}
+            if take(inside, NAME_SUBSTRING):
+                return list(found)
+
+        specialties = self._specialty_index.with_prefix(words[-1])
+        if len(query) >= 3:
+            specialties.update(s for s in self._specialty_index.containing(query) if query in s)
+        if take(whole(self._members(specialties)), SPECIALTY_MATCH):
+            return list(found)
+
+        if fuzzy and len(query) >= FUZZY_MIN_LENGTH:
+            # Everyone sharing a specialty is as similar; group by similarity, closest first
+            query_grams = _padded_trigrams(query)
+            levels = {}
+            for comedian_id, similarity in self._name_index.similar(query_grams, lambda i: self._docs[i][0]):
+                levels.setdefault(similarity, set()).add(comedian_id)
+            for specialty, similarity in self._specialty_index.similar(query_grams, lambda s: s):
+                levels.setdefault(similarity, set()).update(self._specialties[specialty])
+            for similarity in sorted(levels, reverse=True):
+                if take(levels[similarity], FUZZY * similarity):
+                    break
+        return list(found)
+
+    def _members(self, specialties):
+        """Comedian ids listing any of ``specialties``, without copying a single specialty's set."""
+        if len(specialties) == 1:
+            return self._specialties[next(iter(specialties))]
+        return set().union(*(self._specialties[s] for s in specialties))
+
+    def _by_name(self, comedian_ids, skip, need):
+        """The ``need`` first of ``comedian_ids`` not in ``skip``, in name order (all of them if None)."""
+        if need is not None and len(comedian_ids) ** 2 > need * len(self._names):
+            # Common match: walking the roster in name order finds enough within a few steps
+            picked = []
+            for _, comedian_id in self._names:
+                if comedian_id in comedian_ids and comedian_id not in skip:
+                    picked.append(comedian_id)
+                    if len(picked) == need:
+                        break
+            return picked
+        remaining = [comedian_id for comedian_id in comedian_ids if comedian_id not in skip]
+        key = self._docs.__getitem__
+        if need is None:
+            return sorted(remaining, key=key)
+        return heapq.nsmallest(need, remaining, key=key)
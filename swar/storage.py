@@ -0,0 +1,805 @@
+"""SQLite storage for comedians, shows and venues.
+
+All pages read through a single :class:`Repository`. The database runs in WAL
+mode so readers never block the writer, every table is indexed on the columns
+the pages filter and sort by, and read results are memoised against a data
+version counter that is bumped on every write. Every change to a show's
+ticket count is also logged as a dated sale, which is the history the
+revenue forecast is fitted on. Seats are sold and held through conditional
+updates that check capacity inside the write, so concurrent box-office
+sessions can never oversell a show.
+"""
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from swar.models import Comedian, Show, Venue
+
+DEFAULT_DB_PATH = os.environ.get("SWAR_DB_PATH", "swar.db")
+
+# Price per ticket for shows scheduled without an explicit tier
+DEFAULT_TICKET_PRICE = 25
+
+# Length of a show when none is given
+DEFAULT_DURATION_MINUTES = 120
+
+# Allowed values (inclusive), shared by the forms and the bulk importer
+RATING_RANGE = (1.0, 5.0)
+FEE_RANGE = (500, 50000)
+CAPACITY_RANGE = (50, 1000)
+RENTAL_FEE_RANGE = (500, 10000)
+
+# Columns added after the first release, applied to existing databases on open
+MIGRATIONS = [
+    ("shows", "ticket_price", f"REAL NOT NULL DEFAULT {DEFAULT_TICKET_PRICE}"),
+    ("shows", "duration_minutes", f"INTEGER NOT NULL DEFAULT {DEFAULT_DURATION_MINUTES}")
+]
+
+# Tables whose ids must never be handed out twice, even after the newest row
+# is deleted: a session may still hold on to the id of an expired hold, and
+# the caches read new sales from the highest sale id they have seen
+AUTOINCREMENT_TABLES = ["sales", "holds"]
+
+# How long seats put on hold stay reserved before they return to sale
+DEFAULT_HOLD_MINUTES = 10
+
+# Seats of a show reserved by holds that have not yet expired
+HELD_SEATS = "(SELECT coalesce(sum(quantity), 0) FROM holds WHERE show_id = shows.id AND expires_at > :now)"
+
+# How many row-level changes to remember for incremental consumers
+CHANGE_LOG_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comedians (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    rating REAL NOT NULL,
+    fee INTEGER NOT NULL,
+    specialty TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS venues (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    capacity INTEGER NOT NULL,
+    rental_fee INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shows (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    venue_id INTEGER NOT NULL REFERENCES venues(id),
+    capacity INTEGER NOT NULL,
+    tickets_sold INTEGER NOT NULL DEFAULT 0,
+    ticket_price REAL NOT NULL DEFAULT 25,
+    duration_minutes INTEGER NOT NULL DEFAULT 120,
+    CHECK (tickets_sold BETWEEN 0 AND capacity)
+);
+CREATE INDEX IF NOT EXISTS idx_shows_date ON shows(date);
+CREATE INDEX IF NOT EXISTS idx_shows_venue_date ON shows(venue_id, date);
+CREATE INDEX IF NOT EXISTS idx_shows_title_date ON shows(title, date);
+
+CREATE TABLE IF NOT EXISTS show_comedians (
+    show_id INTEGER NOT NULL REFERENCES shows(id) ON DELETE CASCADE,
+    comedian_id INTEGER NOT NULL REFERENCES comedians(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (show_id, comedian_id)
+);
+CREATE INDEX IF NOT EXISTS idx_show_comedians_comedian ON show_comedians(comedian_id);
+
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    show_id INTEGER NOT NULL REFERENCES shows(id) ON DELETE CASCADE,
+    sold_at TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sales_show ON sales(show_id);
+
+CREATE TABLE IF NOT EXISTS holds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    show_id INTEGER NOT NULL REFERENCES shows(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL,
+    expires_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_holds_show ON holds(show_id, expires_at);
+"""
+
+SEED_COMEDIANS = [
+    {"name": "Dave Chappelle", "rating": 4.9, "fee": 15000, "specialty": "Social commentary"},
+    {"name": "Ali Wong", "rating": 4.7, "fee": 10000, "specialty": "Family life"},
+    {"name": "John Mulaney", "rating": 4.8, "fee": 12000, "specialty": "Observational"},
+    {"name": "Hannah Gadsby", "rating": 4.6, "fee": 8000, "specialty": "Storytelling"},
+    {"name": "Kevin Hart", "rating": 4.7, "fee": 20000, "specialty": "Self-deprecating"}
+]
+
+SEED_VENUES = [
+    {"name": "Laugh Factory", "capacity": 200, "rental_fee": 2000},
+    {"name": "Comedy Store", "capacity": 300, "rental_fee": 3000},
+    {"name": "Improv", "capacity": 250, "rental_fee": 2500},
+    {"name": "Stand Up NY", "capacity": 150, "rental_fee": 1500},
+    {"name": "Comedy Cellar", "capacity": 120, "rental_fee": 1200}
+]
+
+# Share of each seed show's tickets sold in each of the weeks leading up to today
+SEED_SALES_WEEKS = [0.1, 0.15, 0.2, 0.25, 0.3]
+
+SEED_SHOWS = [
+    {"title": "Comedy Night", "days_ahead": 7, "venue": "Laugh Factory", "tickets_sold": 150, "comedians": ["Dave Chappelle", "Ali Wong"]},
+    {"title": "Stand Up Special", "days_ahead": 14, "venue": "Comedy Store", "tickets_sold": 200, "comedians": ["John Mulaney", "Kevin Hart"]},
+    {"title": "Comedy Jam", "days_ahead": 21, "venue": "Improv", "tickets_sold": 100, "comedians": ["Hannah Gadsby", "Ali Wong"]}
+]
+
+# Rows per SELECT ... IN (...) lookup, well under SQLite's variable limit
+LOOKUP_BATCH = 900
+
+TABLES = ("comedians", "venues", "shows", "sales", "holds")
+
+COMEDIAN_FIELDS = ("name", "rating", "fee", "specialty")
+VENUE_FIELDS = ("name", "capacity", "rental_fee")
+SHOW_FIELDS = ("title", "date", "venue_id", "capacity", "tickets_sold", "ticket_price", "duration_minutes")
+
+
+# Flat, name-based views of each table used by bulk export
+EXPORT_QUERIES = {
+    "comedians": "SELECT name, rating, fee, specialty FROM comedians ORDER BY id",
+    "venues": "SELECT name, capacity, rental_fee FROM venues ORDER BY id",
+    "shows": (
+        "SELECT s.title, s.date, v.name AS venue, s.capacity, s.tickets_sold, s.ticket_price, s.duration_minutes, "
+        "(SELECT group_concat(name, '; ') FROM ("
+        "  SELECT c.name FROM show_comedians sc JOIN comedians c ON c.id = sc.comedian_id "
+        "  WHERE sc.show_id = s.id ORDER BY sc.position"
+        ")) AS comedians "
+        "FROM shows s JOIN venues v ON v.id = s.venue_id ORDER BY s.date, s.id"
+    )
+}
+
+
+def to_db_date(value):
+    """Serialise a datetime so that text order matches chronological order."""
+    return value.replace(microsecond=0).isoformat(sep=" ")
+
+
+def from_db_date(value):
+    return datetime.fromisoformat(value)
+
+
+def booking_date(show_date):
+    """When sales recorded without a timestamp are booked: now, or the show date if it has passed."""
+    return min(datetime.now(), show_date)
+
+
+def check_tickets(tickets_sold, capacity):
+    """Raise ValueError unless ``tickets_sold`` fits the house; databases created before the CHECK rely on this."""
+    if not 0 <= tickets_sold <= capacity:
+        raise ValueError(f"Tickets sold must be between 0 and the capacity ({capacity}), not {tickets_sold}")
+
+
+class SoldOut(ValueError):
+    """Not enough seats left (after active holds) for a sale or hold."""
+
+    def __init__(self, show_id, requested, available):
+        super().__init__(f"Only {available} seat(s) left, {requested} requested")
+        self.show_id = show_id
+        self.requested = requested
+        self.available = available
+
+
+class NameTaken(ValueError):
+    """Another comedian (or venue) already goes by this name."""
+
+    def __init__(self, table, name):
+        super().__init__(f"The name '{name}' is already taken; pick another one")
+        self.table = table
+        self.name = name
+
+
+class Repository:
+    """Thread-safe, cached access to the Swar database.
+
+    A single instance is shared by every Streamlit session in the process.
+    Each table is mirrored in an id -> row index that is loaded once and then
+    patched row by row after every write, so lookups by id are O(1) and an
+    edit or delete never reloads the table. Each table also records the
+    version at which it last changed, so sessions can tell whether anything
+    they display is stale. Read methods return the immutable records from
+    :mod:`swar.models`, shared between callers; go through the write methods
+    to change data.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, seed=True):
+        self.path = path
+        self.version = 0
+        self._lock = threading.RLock()
+        self._cache = {}
+        self._indexes = {}
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self._log_start = 0
+        self._pending = []
+        self._touched = set()
+        self._bulk = False
+        self._table_versions = {}
+        self._data_version = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._backfill_sales()
+        if seed and self.count_comedians() == 0 and self.count_venues() == 0:
+            self.seed()
+        self.sync()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Internal helpers
+
+    @contextmanager
+    def _write(self):
+        """Run a block inside an IMMEDIATE transaction and bump the version."""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            self._pending, self._touched, self._bulk = [], set(), False
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                self._pending, self._touched, self._bulk = [], set(), False
+                raise
+            cur.execute("COMMIT")
+            self.version += 1
+            self._cache.clear()
+            for table in self._touched:
+                self._table_versions[table] = self.version
+            if self._bulk:
+                # Too many rows to replay; consumers from before this write rebuild
+                self._changes.clear()
+                self._log_start = self.version
+                self._indexes.clear()
+            else:
+                self._changes.extend((self.version, table, op, row_id) for table, op, row_id in self._pending)
+                if len(self._changes) == self._changes.maxlen:
+                    # Entries of the oldest version left may have been dropped with older ones
+                    self._log_start = max(self._log_start, self._changes[0][0])
+                for table, op, row_id in self._pending:
+                    self._patch_index(table, op, row_id)
+            self._pending, self._touched, self._bulk = [], set(), False
+
+    @contextmanager
+    def _unique_name(self, table, name):
+        """Turn a clash on the unique ``name`` column of ``table`` into :class:`NameTaken`."""
+        try:
+            yield
+        except sqlite3.IntegrityError as error:
+            if f"{table}.name" not in str(error):
+                raise
+            raise NameTaken(table, name) from None
+
+    def _record(self, table, op, row_id):
+        """Note a row-level change made inside the current write transaction."""
+        self._pending.append((table, op, row_id))
+        self._touched.add(table)
+
+    def _record_bulk(self, *tables):
+        """Note that the current transaction changed too many rows of ``tables`` to log one by one."""
+        self._bulk = True
+        self._touched.update(tables)
+
+    def _touch(self, table):
+        """Note a change that consumers of the change log do not need, but watchers of ``table`` do."""
+        self._touched.add(table)
+
+    def table_version(self, *tables):
+        """The data version at which any of ``tables`` last changed (0 if never, in this process)."""
+        return max((self._table_versions.get(table, 0) for table in tables), default=0)
+
+    def sync(self):
+        """Pick up commits made through other connections, such as another process or the bulk CLI.
+
+        Cheap enough to call on every run: SQLite bumps ``PRAGMA data_version``
+        only when another connection commits. Such changes are not in the
+        change log, so every cache and consumer is made to rebuild.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            if self._data_version is not None:
+                self.version += 1
+                self._cache.clear()
+                self._indexes.clear()
+                self._changes.clear()
+                self._log_start = self.version
+                for table in TABLES:
+                    self._table_versions[table] = self.version
+            self._data_version = data_version
+
+    def changes_since(self, version):
+        """Row-level changes committed after ``version``, oldest first.
+
+        Each change is a ``(version, table, op, id)`` tuple where ``op`` is
+        ``"insert"``, ``"update"`` or ``"delete"``. Returns ``None`` when the
+        log no longer reaches back that far and the caller must rebuild.
+        Writes that log nothing (such as seat holds) bump the version without
+        leaving a gap, so the list may be empty.
+        """
+        with self._lock:
+            if version == self.version:
+                return []
+            if version > self.version or version < self._log_start:
+                return None
+            return [change for change in self._changes if change[0] > version]
+
+    def _index(self, table):
+        """The id -> row index for ``table``, loaded on first use."""
+        with self._lock:
+            index = self._indexes.get(table)
+            if index is None:
+                index = self._indexes[table] = {row.id: row for row in self._load(table)}
+            return index
+
+    def _load(self, table, row_id=None):
+        if table == "shows":
+            return self._load_shows(row_id)
+        record = {"comedians": Comedian, "venues": Venue}[table]
+        sql = f"SELECT {', '.join(record._fields)} FROM {table}"
+        if row_id is None:
+            return list(map(record._make, self._tuples(sql + " ORDER BY id")))
+        return list(map(record._make, self._tuples(sql + " WHERE id = ?", (row_id,))))
+
+    def _patch_index(self, table, op, row_id):
+        """Bring one row of a loaded index up to date after a committed write."""
+        index = self._indexes.get(table)
+        if index is not None:
+            rows = [] if op == "delete" else self._load(table, row_id)
+            if rows:
+                index[row_id] = rows[0]
+            else:
+                index.pop(row_id, None)
+        if table == "comedians" and op == "delete":
+            # Their lineup entries were deleted with them
+            self._indexes.pop("shows", None)
+            self._table_versions["shows"] = self.version
+
+    def _cached(self, key, loader):
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = loader()
+            return self._cache[key]
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _tuples(self, sql, params=()):
+        """Like :meth:`_query`, but as plain tuples, which are much cheaper for large reads."""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.row_factory = None
+            return cur.execute(sql, params).fetchall()
+
+    def _migrate(self):
+        for table, column, definition in MIGRATIONS:
+            columns = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        for table in AUTOINCREMENT_TABLES:
+            self._add_autoincrement(table)
+
+    def _add_autoincrement(self, table):
+        """Recreate ``table`` of a database from before its ids were AUTOINCREMENT, keeping its rows."""
+        schema = [row[0] for row in self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL ORDER BY type DESC", (table,)
+        )]
+        if "AUTOINCREMENT" in schema[0]:
+            return
+        create = schema[0].replace("id INTEGER PRIMARY KEY", "id INTEGER PRIMARY KEY AUTOINCREMENT", 1)
+        with self._lock:
+            try:
+                self._conn.executescript(
+                    f"BEGIN IMMEDIATE; ALTER TABLE {table} RENAME TO {table}_old; {create}; "
+                    f"INSERT INTO {table} SELECT * FROM {table}_old; DROP TABLE {table}_old; "
+                    + "".join(f"{index}; " for index in schema[1:]) + "COMMIT;"
+                )
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def _backfill_sales(self):
+        """Give databases created before sales were logged one sale per show."""
+        if self._query("SELECT 1 FROM sales LIMIT 1") or not self._query("SELECT 1 FROM shows WHERE tickets_sold != 0 LIMIT 1"):
+            return
+        now = to_db_date(datetime.now())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sales (show_id, sold_at, quantity, price) "
+                "SELECT id, min(date, ?), tickets_sold, ticket_price FROM shows WHERE tickets_sold != 0",
+                (now,)
+            )
+
+    def seed(self):
+        """Load the demo roster, venues and shows into an empty database."""
+        now = datetime.now()
+        for comedian in SEED_COMEDIANS:
+            self.add_comedian(**comedian)
+        venue_ids = {v["name"]: self.add_venue(**v) for v in SEED_VENUES}
+        comedian_ids = self.comedian_ids_by_name()
+        capacities = {v["name"]: v["capacity"] for v in SEED_VENUES}
+        for show in SEED_SHOWS:
+            show_id = self.add_show(
+                title=show["title"],
+                date=now + timedelta(days=show["days_ahead"]),
+                venue_id=venue_ids[show["venue"]],
+                capacity=capacities[show["venue"]],
+                comedian_ids=[comedian_ids[name] for name in show["comedians"]]
+            )
+            weeks = len(SEED_SALES_WEEKS)
+            for week, share in enumerate(SEED_SALES_WEEKS):
+                quantity = round(show["tickets_sold"] * share)
+                if quantity:
+                    self.sell_tickets(show_id, quantity, sold_at=now - timedelta(weeks=weeks - 1 - week))
+
+    # Comedians
+
+    def count_comedians(self):
+        return len(self._index("comedians"))
+
+    def list_comedians(self):
+        """All comedians in the order they were added."""
+        return self._cached("comedians", lambda: list(self._index("comedians").values()))
+
+    def get_comedian(self, comedian_id):
+        return self._index("comedians").get(comedian_id)
+
+    def add_comedian(self, name, rating, fee, specialty=""):
+        with self._unique_name("comedians", name), self._write() as cur:
+            cur.execute(
+                "INSERT INTO comedians (name, rating, fee, specialty) VALUES (?, ?, ?, ?)",
+                (name, rating, fee, specialty)
+            )
+            self._record("comedians", "insert", cur.lastrowid)
+            return cur.lastrowid
+
+    def update_comedian(self, comedian_id, **fields):
+        self._update("comedians", COMEDIAN_FIELDS, comedian_id, fields)
+
+    def delete_comedian(self, comedian_id):
+        with self._write() as cur:
+            cur.execute("DELETE FROM comedians WHERE id = ?", (comedian_id,))
+            self._record("comedians", "delete", comedian_id)
+
+    # Venues
+
+    def count_venues(self):
+        return len(self._index("venues"))
+
+    def list_venues(self):
+        """All venues in the order they were added."""
+        return self._cached("venues", lambda: list(self._index("venues").values()))
+
+    def get_venue(self, venue_id):
+        return self._index("venues").get(venue_id)
+
+    def add_venue(self, name, capacity, rental_fee):
+        with self._unique_name("venues", name), self._write() as cur:
+            cur.execute(
+                "INSERT INTO venues (name, capacity, rental_fee) VALUES (?, ?, ?)",
+                (name, capacity, rental_fee)
+            )
+            self._record("venues", "insert", cur.lastrowid)
+            return cur.lastrowid
+
+    # Shows
+
+    def count_shows(self):
+        return len(self._index("shows"))
+
+    def list_shows(self):
+        """All shows ordered by date."""
+        return self._cached("shows", lambda: sorted(self._index("shows").values(), key=lambda s: (s.date, s.id)))
+
+    def get_show(self, show_id):
+        return self._index("shows").get(show_id)
+
+    def lineup(self, show):
+        """The comedians booked for ``show``, in running order."""
+        comedians = self._index("comedians")
+        return [comedians[comedian_id] for comedian_id in show.comedian_ids if comedian_id in comedians]
+
+    def _load_shows(self, show_id=None):
+        lineup_filter, show_filter, params = "", "", ()
+        if show_id is not None:
+            lineup_filter, show_filter, params = "WHERE show_id = ?", "WHERE id = ?", (show_id,)
+
+        lineups = {}
+        for lineup_show_id, comedian_id in self._tuples(
+            f"SELECT show_id, comedian_id FROM show_comedians {lineup_filter} ORDER BY show_id, position",
+            params
+        ):
+            lineups.setdefault(lineup_show_id, []).append(comedian_id)
+
+        return [
+            Show(row_id, sys.intern(title), from_db_date(date), *rest, tuple(lineups.get(row_id, ())))
+            for row_id, title, date, *rest in self._tuples(
+                "SELECT id, title, date, venue_id, capacity, tickets_sold, ticket_price, duration_minutes "
+                f"FROM shows {show_filter} ORDER BY date, id",
+                params
+            )
+        ]
+
+    def add_show(self, title, date, venue_id, capacity, comedian_ids, tickets_sold=0,
+                 ticket_price=DEFAULT_TICKET_PRICE, duration_minutes=DEFAULT_DURATION_MINUTES):
+        check_tickets(tickets_sold, capacity)
+        with self._write() as cur:
+            cur.execute(
+                "INSERT INTO shows (title, date, venue_id, capacity, tickets_sold, ticket_price, duration_minutes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (title, to_db_date(date), venue_id, capacity, tickets_sold, ticket_price, duration_minutes)
+            )
+            show_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO show_comedians (show_id, comedian_id, position) VALUES (?, ?, ?)",
+                [(show_id, comedian_id, position) for position, comedian_id in enumerate(comedian_ids)]
+            )
+            self._record("shows", "insert", show_id)
+            if tickets_sold:
+                self._add_sale(cur, show_id, tickets_sold, ticket_price, booking_date(date))
+            return show_id
+
+    def update_show(self, show_id, **fields):
+        """Change stored show fields; a new ``tickets_sold`` is logged as a sale (or refund) of the difference."""
+        if "date" in fields:
+            fields["date"] = to_db_date(fields["date"])
+        self._update("shows", SHOW_FIELDS, show_id, fields)
+
+    def delete_show(self, show_id):
+        with self._write() as cur:
+            cur.execute("DELETE FROM shows WHERE id = ?", (show_id,))
+            self._record("shows", "delete", show_id)
+
+    def _update(self, table, allowed, row_id, fields):
+        unknown = set(fields) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown {table} field(s): {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._unique_name(table, fields.get("name")), self._write() as cur:
+            if table == "shows" and ("tickets_sold" in fields or "capacity" in fields):
+                row = cur.execute("SELECT tickets_sold, capacity FROM shows WHERE id = ?", (row_id,)).fetchone()
+                if row is not None:
+                    check_tickets(fields.get("tickets_sold", row["tickets_sold"]), fields.get("capacity", row["capacity"]))
+            if table == "shows" and "tickets_sold" in fields:
+                self._log_ticket_change(cur, row_id, fields)
+            cur.execute(f"UPDATE {table} SET {assignments} WHERE id = ?", (*fields.values(), row_id))
+            self._record(table, "update", row_id)
+
+    # Tickets
+    #
+    # Seats are sold and held with conditional statements that only apply if
+    # the show still has room, so concurrent sales from any number of
+    # sessions (or processes) can never oversell it.
+
+    def sell_tickets(self, show_id, quantity, sold_at=None):
+        """Sell ``quantity`` seats at the show's current price, or raise :class:`SoldOut`."""
+        with self._write() as cur:
+            self._sell(cur, show_id, quantity, sold_at or datetime.now())
+
+    def hold_tickets(self, show_id, quantity, minutes=DEFAULT_HOLD_MINUTES):
+        """Reserve ``quantity`` seats for ``minutes`` and return the hold id, or raise :class:`SoldOut`."""
+        if quantity < 1:
+            raise ValueError("Hold at least one ticket")
+        now = datetime.now()
+        with self._write() as cur:
+            cur.execute("DELETE FROM holds WHERE expires_at <= ?", (to_db_date(now),))
+            cur.execute(
+                "INSERT INTO holds (show_id, quantity, expires_at) "
+                f"SELECT id, :quantity, :expires FROM shows WHERE id = :show AND tickets_sold + :quantity + {HELD_SEATS} <= capacity",
+                {"show": show_id, "quantity": quantity, "now": to_db_date(now),
+                 "expires": to_db_date(now + timedelta(minutes=minutes))}
+            )
+            if not cur.rowcount:
+                raise self._sold_out(cur, show_id, quantity, now)
+            self._touch("holds")
+            return cur.lastrowid
+
+    def get_hold(self, hold_id):
+        """A hold that has not expired, as a dict, or ``None``."""
+        rows = self._query(
+            "SELECT id, show_id, quantity, expires_at FROM holds WHERE id = ? AND expires_at > ?",
+            (hold_id, to_db_date(datetime.now()))
+        )
+        if not rows:
+            return None
+        hold = dict(rows[0])
+        hold["expires_at"] = from_db_date(hold["expires_at"])
+        return hold
+
+    def confirm_hold(self, hold_id):
+        """Sell the seats of a hold; an expired hold is sold only if the seats are still free."""
+        with self._write() as cur:
+            hold = cur.execute("SELECT show_id, quantity FROM holds WHERE id = ?", (hold_id,)).fetchone()
+            if hold is None:
+                raise ValueError("This hold has been released")
+            cur.execute("DELETE FROM holds WHERE id = ?", (hold_id,))
+            self._touch("holds")
+            self._sell(cur, hold["show_id"], hold["quantity"], datetime.now())
+
+    def release_hold(self, hold_id):
+        with self._write() as cur:
+            cur.execute("DELETE FROM holds WHERE id = ?", (hold_id,))
+            self._touch("holds")
+
+    def held_tickets(self):
+        """Seats on active holds, by show id."""
+        rows = self._query(
+            "SELECT show_id, sum(quantity) FROM holds WHERE expires_at > ? GROUP BY show_id",
+            (to_db_date(datetime.now()),)
+        )
+        return {show_id: held for show_id, held in rows}
+
+    def _sell(self, cur, show_id, quantity, sold_at):
+        if quantity < 1:
+            raise ValueError("Sell at least one ticket")
+        now = datetime.now()
+        cur.execute(
+            "UPDATE shows SET tickets_sold = tickets_sold + :quantity "
+            f"WHERE id = :show AND tickets_sold + :quantity + {HELD_SEATS} <= capacity",
+            {"show": show_id, "quantity": quantity, "now": to_db_date(now)}
+        )
+        if not cur.rowcount:
+            raise self._sold_out(cur, show_id, quantity, now)
+        self._record("shows", "update", show_id)
+        price = cur.execute("SELECT ticket_price FROM shows WHERE id = ?", (show_id,)).fetchone()[0]
+        self._add_sale(cur, show_id, quantity, price, sold_at)
+
+    def _sold_out(self, cur, show_id, quantity, now):
+        row = cur.execute(
+            f"SELECT capacity - tickets_sold - {HELD_SEATS} FROM shows WHERE id = :show",
+            {"show": show_id, "now": to_db_date(now)}
+        ).fetchone()
+        if row is None:
+            return ValueError(f"No show with id {show_id}")
+        return SoldOut(show_id, quantity, max(row[0], 0))
+
+    # Sales
+
+    def _add_sale(self, cur, show_id, quantity, price, sold_at):
+        cur.execute(
+            "INSERT INTO sales (show_id, sold_at, quantity, price) VALUES (?, ?, ?, ?)",
+            (show_id, to_db_date(sold_at), quantity, price)
+        )
+        self._record("sales", "insert", cur.lastrowid)
+
+    def _log_ticket_change(self, cur, show_id, fields):
+        row = cur.execute("SELECT tickets_sold, ticket_price, date FROM shows WHERE id = ?", (show_id,)).fetchone()
+        if row is not None and fields["tickets_sold"] != row["tickets_sold"]:
+            price = fields.get("ticket_price", row["ticket_price"])
+            date = from_db_date(fields.get("date", row["date"]))
+            self._add_sale(cur, show_id, fields["tickets_sold"] - row["tickets_sold"], price, booking_date(date))
+
+    def sales_since(self, after_id=0):
+        """Sales logged after ``after_id`` as ``(id, show_id, sold_at, revenue)`` tuples, oldest first.
+
+        Rows are plain tuples with ``sold_at`` left as stored text, so that
+        callers reading the whole log can parse it in bulk.
+        """
+        return self._tuples(
+            "SELECT id, show_id, sold_at, quantity * price FROM sales WHERE id > ? ORDER BY id",
+            (after_id,)
+        )
+
+    def sales_by_show(self, after_id=0):
+        """First and last sale time and last sale id per show, over sales logged after ``after_id``.
+
+        Returns ``{show_id: (first_sold_at, last_sold_at, last_sale_id)}``,
+        aggregated in SQLite so the whole log never has to be read.
+        """
+        return {
+            show_id: (from_db_date(first), from_db_date(last), last_id)
+            for show_id, first, last, last_id in self._tuples(
+                "SELECT show_id, MIN(sold_at), MAX(sold_at), MAX(id) FROM sales WHERE id > ? GROUP BY show_id",
+                (after_id,)
+            )
+        }
+
+    # Bulk import and export
+
+    def comedian_ids_by_name(self):
+        return self._cached("comedian_ids_by_name", lambda: {c.name: c.id for c in self.list_comedians()})
+
+    def venues_by_name(self):
+        return self._cached("venues_by_name", lambda: {v.name: v for v in self.list_venues()})
+
+    def bulk_upsert(self, table, rows, update=False):
+        """Insert comedians or venues in one transaction, de-duplicated on name.
+
+        Rows whose name already exists are skipped, or overwritten when
+        ``update`` is set. Returns ``(inserted, updated, skipped)``.
+        """
+        fields = {"comedians": COMEDIAN_FIELDS, "venues": VENUE_FIELDS}[table]
+        with self._write() as cur:
+            existing = set()
+            names = [row["name"] for row in rows]
+            for i in range(0, len(names), LOOKUP_BATCH):
+                batch = names[i:i + LOOKUP_BATCH]
+                placeholders = ", ".join("?" * len(batch))
+                existing.update(r[0] for r in cur.execute(f"SELECT name FROM {table} WHERE name IN ({placeholders})", batch))
+            new_rows = [row for row in rows if row["name"] not in existing]
+            old_rows = [row for row in rows if row["name"] in existing] if update else []
+            cur.executemany(
+                f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                [tuple(row[field] for field in fields) for row in new_rows]
+            )
+            cur.executemany(
+                f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields[1:])} WHERE name = ?",
+                [tuple(row[field] for field in fields[1:]) + (row["name"],) for row in old_rows]
+            )
+            self._record_bulk(table)
+        return len(new_rows), len(old_rows), len(rows) - len(new_rows) - len(old_rows)
+
+    def bulk_add_shows(self, rows):
+        """Insert shows in one transaction, skipping any with an existing title and date.
+
+        Each row needs the :data:`SHOW_FIELDS` plus ``comedian_ids``. Returns
+        ``(inserted, skipped)``.
+        """
+        inserted = 0
+        with self._write() as cur:
+            for row in rows:
+                date = to_db_date(row["date"])
+                if cur.execute("SELECT 1 FROM shows WHERE title = ? AND date = ?", (row["title"], date)).fetchone():
+                    continue
+                cur.execute(
+                    f"INSERT INTO shows ({', '.join(SHOW_FIELDS)}) VALUES ({', '.join('?' * len(SHOW_FIELDS))})",
+                    tuple(date if field == "date" else row[field] for field in SHOW_FIELDS)
+                )
+                show_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT OR IGNORE INTO show_comedians (show_id, comedian_id, position) VALUES (?, ?, ?)",
+                    [(show_id, comedian_id, position) for position, comedian_id in enumerate(row["comedian_ids"])]
+                )
+                if row["tickets_sold"]:
+                    cur.execute(
+                        "INSERT INTO sales (show_id, sold_at, quantity, price) VALUES (?, ?, ?, ?)",
+                        (show_id, to_db_date(booking_date(row["date"])), row["tickets_sold"], row["ticket_price"])
+                    )
+                inserted += 1
+            self._record_bulk("shows", "sales")
+        return inserted, len(rows) - inserted
+
+    def iter_export(self, table, chunksize=10000):
+        """Yield lists of export-ready row dicts for ``table``, ``chunksize`` at a time.
+
+        File databases are read through a separate connection so a long
+        export never holds up writers (WAL gives it a consistent snapshot).
+        """
+        sql = EXPORT_QUERIES[table]
+        if self.path == ":memory:":
+            rows = [dict(row) for row in self._query(sql)]
+            for i in range(0, len(rows), chunksize):
+                yield rows[i:i + chunksize]
+            return
+        conn = sqlite3.connect(self.path)
+        try:
+            cur = conn.execute(sql)
+            columns = [column[0] for column in cur.description]
+            while True:
+                rows = cur.fetchmany(chunksize)
+                if not rows:
+                    return
+                yield [dict(zip(columns, row)) for row in rows]
+        finally:
+            conn.close()
@@ -0,0 +1,87 @@
+"""Running totals and the next shows on the calendar, for the Dashboard.
+
+The Dashboard's headline numbers (tickets sold, seats offered, shows still
+to come) are kept as running sums: every show contributes its tickets and
+capacity, and a change to a show swaps its old contribution for the new
+one, so reading them costs nothing however large the catalogue is.
+
+Upcoming shows sit in a min-heap ordered by date. Edits push a fresh entry
+and leave the old one behind, marked stale by a per-show sequence number;
+shows that have started fall off the top as time passes. Listing the next
+``n`` pops them and pushes them back, O(n log N) for N upcoming shows.
+"""
+import heapq
+from datetime import datetime
+
+from swar.incremental import IncrementalCache
+
+
+class DashboardSummary(IncrementalCache):
+    """Ticket and capacity totals plus an upcoming-shows heap, kept in sync with a Repository."""
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+        self._sequence = 0
+        self._cutoff = datetime.min
+
+    @property
+    def occupancy_rate(self):
+        """Tickets sold as a percentage of all seats offered (0 with no shows)."""
+        return self.tickets_sold / self.capacity * 100 if self.capacity else 0.0
+
+    def refresh(self, repo, now=None):
+        """Bring the totals up to ``repo.version``, drop shows that have started, and return the summary."""
+        with self._lock:
+            super().refresh(repo)
+            self._expire(now or datetime.now())
+            return self
+
+    def upcoming(self, n):
+        """Ids of the next ``n`` shows that have not started, soonest first."""
+        with self._lock:
+            taken = []
+            while self._heap and len(taken) < n:
+                entry = heapq.heappop(self._heap)
+                if self._current(entry):
+                    taken.append(entry)
+            for entry in taken:
+                heapq.heappush(self._heap, entry)
+            return [show_id for _, _, show_id in taken]
+
+    def _reset(self):
+        self.tickets_sold = self.capacity = self.upcoming_count = 0
+        self._shows, self._heap = {}, []
+
+    def _set(self, show_id, show):
+        old = self._shows.pop(show_id, None)
+        if old is not None:
+            date, tickets, capacity, _ = old
+            self.tickets_sold -= tickets
+            self.capacity -= capacity
+            if date >= self._cutoff:
+                self.upcoming_count -= 1
+        if show is None:
+            return
+        self._sequence += 1
+        self._shows[show_id] = (show.date, show.tickets_sold, show.capacity, self._sequence)
+        self.tickets_sold += show.tickets_sold
+        self.capacity += show.capacity
+        if show.date >= self._cutoff:
+            self.upcoming_count += 1
+            heapq.heappush(self._heap, (show.date, self._sequence, show_id))
+        # Stale entries are dropped as they surface; compact if they pile up
+        if len(self._heap) > 2 * self.upcoming_count + 64:
+            self._heap = [entry for entry in self._heap if self._current(entry)]
+            heapq.heapify(self._heap)
+
+    def _expire(self, now):
+        while self._heap and self._heap[0][0] < now:
+            entry = heapq.heappop(self._heap)
+            if self._current(entry):
+                self.upcoming_count -= 1
+        self._cutoff = max(self._cutoff, now)
+
+    def _current(self, entry):
+        show = self._shows.get(entry[2])
+        return show is not None and show[3] == entry[1]